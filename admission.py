@@ -0,0 +1,177 @@
+# admission.py - Token-Bucket Admission Control
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import REGISTRY as METRICS
+
+class Overloaded(Exception):
+    """Request shed by admission control"""
+
+    def __init__(self, reason, retry_after):
+        self.reason = reason
+        self.retry_after = retry_after
+        super().__init__(f"Too many requests ({reason}); retry in {retry_after:.0f}s")
+
+class TokenBucket:
+    """Refills at rate tokens/second up to burst; each request takes one token"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def wait(self, now):
+        """Refill, then return 0 if a token is available, else seconds until one is"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        """Take a token; returns 0 on success, else seconds until one is available"""
+        wait = self.wait(now)
+        if not wait:
+            self.tokens -= 1
+        return wait
+
+class AdmissionController:
+    """
+    Per-key token buckets plus a global cap on concurrent requests
+
+    Keys are strings such as 'user:42' or 'ip:10.0.0.7'; a request must get
+    a token from every key it presents. Buckets live in a bounded LRU so a
+    flood of distinct keys cannot grow memory. Nothing ever waits: a request
+    that is over its rate or above the concurrency cap raises Overloaded
+    straight away with a retry hint.
+    """
+
+    def __init__(self, name, rate, burst, max_concurrent, max_keys=10000):
+        """
+        Parameters:
+        - name: Label for the admitted/shed counters (e.g. 'predict')
+        - rate: Sustained requests per second per key
+        - burst: Requests a key may make back to back
+        - max_concurrent: Requests in progress at once across all keys
+        - max_keys: Buckets kept before the least recently used are dropped
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.max_keys = max_keys
+        self.in_flight = 0
+
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._admitted = METRICS.counter('admission_admitted', 'Requests admitted', path=name)
+        self._in_flight_gauge = METRICS.gauge('admission_in_flight', 'Admitted requests in progress', path=name)
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _shed(self, reason, retry_after):
+        METRICS.counter('admission_shed', 'Requests shed by admission control', path=self.name, reason=reason).inc()
+        raise Overloaded(reason, retry_after)
+
+    def acquire(self, *keys):
+        """Admit one request or raise Overloaded; call release() when it finishes"""
+        keys = [key for key in keys if key]
+        with self._lock:
+            if self.in_flight >= self.max_concurrent:
+                self._shed('concurrency', 1.0)
+            # Check every bucket before debiting any, so a request rejected on
+            # one key costs nothing against the others
+            now = time.monotonic()
+            buckets = [self._bucket(key) for key in keys]
+            for key, bucket in zip(keys, buckets):
+                wait = bucket.wait(now)
+                if wait:
+                    self._shed(key.split(':', 1)[0] + '_rate', math.ceil(wait))
+            for bucket in buckets:
+                bucket.tokens -= 1
+            self.in_flight += 1
+        self._admitted.inc()
+        self._in_flight_gauge.set(self.in_flight)
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+        self._in_flight_gauge.set(self.in_flight)
+
+    def admit(self, *keys):
+        """Context manager around acquire()/release()"""
+        return _Admission(self, keys)
+
+class _Admission:
+    __slots__ = ('controller', 'keys')
+
+    def __init__(self, controller, keys):
+        self.controller = controller
+        self.keys = keys
+
+    def __enter__(self):
+        self.controller.acquire(*self.keys)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.controller.release()
+        return False
+
+def _limit(variable, default):
+    return float(os.environ.get(variable, default))
+
+# Process-wide controllers shared by every session and server connection
+PREDICT_ADMISSION = AdmissionController(
+    'predict',
+    rate=_limit('PREDICT_RATE', 5),
+    burst=_limit('PREDICT_BURST', 20),
+    max_concurrent=int(_limit('PREDICT_MAX_CONCURRENT', 64))
+)
+LOGIN_ADMISSION = AdmissionController(
+    'login',
+    rate=_limit('LOGIN_RATE', 0.2),
+    burst=_limit('LOGIN_BURST', 5),
+    max_concurrent=int(_limit('LOGIN_MAX_CONCURRENT', 8))
+)
+API_ADMISSION = AdmissionController(
+    'api',
+    rate=_limit('API_RATE', 1000),
+    burst=_limit('API_BURST', 2000),
+    max_concurrent=int(_limit('API_MAX_CONCURRENT', 256))
+)
+
+def client_ip():
+    """Remote address of the current Streamlit session, when available"""
+    try:
+        import streamlit as st
+
+        ip = getattr(st.context, 'ip_address', None)
+        if not ip:
+            forwarded = st.context.headers.get('X-Forwarded-For', '')
+            ip = forwarded.split(',')[0].strip()
+        return ip or None
+    except Exception:
+        return None
+
+def session_id():
+    """Streamlit session id, as a per-client key when the address is unknown"""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        return ctx.session_id if ctx else 'unknown'
+    except Exception:
+        return 'unknown'
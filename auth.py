@@ -3,6 +3,7 @@
 import streamlit as st
 import re
 from db import Database
+from admission import LOGIN_ADMISSION, Overloaded, client_ip, session_id
 
 # Initialize database
 db = Database()
@@ -446,8 +447,16 @@ def login_page():
             if not username or not password:
                 st.markdown('<div class="error-message">⚠️ Please fill in all fields</div>', unsafe_allow_html=True)
             else:
-                # Verify credentials
-                result = db.verify_user(username, password)
+                # Verify credentials, rate limited per client and per (client,
+                # username) pair; never by bare username, which anyone could
+                # exhaust to lock the real user out
+                client = client_ip() or session_id()
+                try:
+                    with LOGIN_ADMISSION.admit(f"ip:{client}", f"pair:{client}|{username}"):
+                        result = db.verify_user(username, password)
+                except Overloaded as e:
+                    result = {'success': False,
+                              'message': f'Too many login attempts. Please try again in {e.retry_after:.0f} seconds.'}
                 
                 if result['success']:
                     # Store user info in session state
@@ -0,0 +1,220 @@
+# benchmark.py - Inference and Load Benchmarks with Regression Thresholds
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from prediction_function import load_model_and_scaler, predict_student_score, predict_student_scores_batch
+
+BASELINE_FILE = 'benchmark_baseline.json'
+DEFAULT_TOLERANCE = 0.25
+BATCH_SIZES = (1, 10, 100, 1000, 10000, 100000, 1000000)
+QUICK_BATCH_SIZES = (1, 100, 10000, 100000)
+
+# Differences smaller than this are timer or allocator noise, not regressions
+NOISE_FLOOR = {'s': 0.01, 'us': 5.0, 'MB': 0.5, 'rows/s': 0.0}
+
+COLD_LOAD_SNIPPETS = {
+    'pickle': "from prediction_function import load_model_and_scaler; load_model_and_scaler()",
+    'artifact': "from model_artifact import load_artifact_model_and_scaler; load_artifact_model_and_scaler()"
+}
+
+def metric(value, unit, better='lower'):
+    return {'value': float(value), 'unit': unit, 'better': better}
+
+def random_rows(feature_names, feature_info, n, seed=0):
+    """Uniform rows inside each feature's recorded min/max range"""
+    rng = np.random.default_rng(seed)
+    lows = np.array([feature_info[name]['min'] for name in feature_names], dtype=float)
+    highs = np.array([feature_info[name]['max'] for name in feature_names], dtype=float)
+    return lows + rng.random((n, len(feature_names))) * (highs - lows)
+
+def bench_cold_load(repeats=3):
+    """Median time to import and load the model in a fresh interpreter"""
+    results = {}
+    for name, snippet in COLD_LOAD_SNIPPETS.items():
+        if name == 'artifact' and not os.path.exists('student_score_model.bin'):
+            continue
+        code = f"import time; t = time.perf_counter(); {snippet}; print(time.perf_counter() - t)"
+        timings = []
+        for _ in range(repeats):
+            output = subprocess.run([sys.executable, '-W', 'ignore', '-c', code], check=True,
+                                    capture_output=True, text=True)
+            timings.append(float(output.stdout.strip().splitlines()[-1]))
+        results[f'cold_load.{name}_s'] = metric(np.median(timings), 's')
+    return results
+
+def latency_percentiles(name, call, rows, warmup=50):
+    """p50/p95/p99 wall time of call(row) in microseconds"""
+    for row in rows[:warmup]:
+        call(row)
+    timings = np.empty(len(rows))
+    for i, row in enumerate(rows):
+        started = time.perf_counter()
+        call(row)
+        timings[i] = time.perf_counter() - started
+    p50, p95, p99 = np.percentile(timings * 1e6, [50, 95, 99])
+    return {
+        f'latency.{name}.p50_us': metric(p50, 'us'),
+        f'latency.{name}.p95_us': metric(p95, 'us'),
+        f'latency.{name}.p99_us': metric(p99, 'us')
+    }
+
+def bench_single(model, scaler, feature_names, feature_info, calls=2000):
+    """Single-call latency of the library function and the app's predict_score"""
+    rows = random_rows(feature_names, feature_info, calls, seed=1).tolist()
+    results = latency_percentiles(
+        'predict_student_score',
+        lambda row: predict_student_score(model, scaler, row, feature_names),
+        rows
+    )
+
+    # Importing the app opens (and migrates) its database; keep the real one untouched
+    os.environ['STUDENT_DB'] = os.path.join(tempfile.mkdtemp(prefix='benchmark_'), 'benchmark.db')
+    import streamlit_app
+
+    # The app's live model, so calls take the production path (admission,
+    # micro-batch dispatcher, cache) rather than the retired-model fallback.
+    # Distinct rows, so every call is a cache miss.
+    app_model, app_scaler, _, _ = streamlit_app.load_model_and_data()
+    if streamlit_app.model_version(app_model) is None:
+        raise RuntimeError("streamlit_app did not load a live model bundle")
+    results.update(latency_percentiles(
+        'streamlit_predict_score',
+        lambda row: streamlit_app.predict_score(app_model, app_scaler, row, feature_names),
+        random_rows(feature_names, feature_info, calls, seed=2).tolist()
+    ))
+    return results
+
+def bench_batches(model, scaler, feature_names, feature_info, sizes=BATCH_SIZES, min_seconds=0.5):
+    """Rows/second and peak traced memory of predict_student_scores_batch per batch size"""
+    results = {}
+    for size in sizes:
+        rows = random_rows(feature_names, feature_info, size, seed=size)
+        predict_student_scores_batch(model, scaler, rows, feature_names)
+
+        calls, started = 0, time.perf_counter()
+        while True:
+            predict_student_scores_batch(model, scaler, rows, feature_names)
+            calls += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds or calls >= 10000:
+                break
+        results[f'throughput.batch_{size}_rows_per_s'] = metric(calls * size / elapsed, 'rows/s', 'higher')
+
+        tracemalloc.start()
+        predict_student_scores_batch(model, scaler, rows, feature_names)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[f'memory.batch_{size}_peak_mb'] = metric(peak / 1e6, 'MB')
+    return results
+
+def skipped_metrics(quick=False):
+    """Baseline metrics a run deliberately does not measure"""
+    skipped = set()
+    if quick:
+        for size in set(BATCH_SIZES) - set(QUICK_BATCH_SIZES):
+            skipped.update({f'throughput.batch_{size}_rows_per_s', f'memory.batch_{size}_peak_mb'})
+    return skipped
+
+def run_benchmarks(quick=False):
+    with open('model_info.json', 'r') as f:
+        feature_names = json.load(f)['features']
+    with open('feature_info.json', 'r') as f:
+        feature_info = json.load(f)
+
+    results = bench_cold_load(repeats=1 if quick else 3)
+    model, scaler = load_model_and_scaler()
+    results.update(bench_single(model, scaler, feature_names, feature_info, calls=300 if quick else 2000))
+    results.update(bench_batches(model, scaler, feature_names, feature_info,
+                                 QUICK_BATCH_SIZES if quick else BATCH_SIZES,
+                                 min_seconds=0.1 if quick else 0.5))
+    return results
+
+def compare(results, baseline, tolerance=None, skipped=()):
+    """
+    Check results against a baseline
+
+    Each baseline metric may carry its own 'tolerance'; otherwise the
+    file-level value (or the tolerance argument, when given) applies.
+    A metric on only one side is a failure (a benchmark that stopped
+    running, or one the baseline lacks) unless it is in skipped.
+    Returns a list of regression messages, empty when everything passes.
+    """
+    default_tolerance = tolerance if tolerance is not None else baseline.get('tolerance', DEFAULT_TOLERANCE)
+    metrics = baseline.get('metrics', {})
+    regressions = [f"{name}: measured but missing from the baseline"
+                   for name in results if name not in metrics]
+    for name, expected in metrics.items():
+        if name not in results:
+            if name not in skipped:
+                regressions.append(f"{name}: in the baseline but not measured")
+            continue
+        allowed = expected.get('tolerance', default_tolerance)
+        base, value = expected['value'], results[name]['value']
+        if abs(value - base) <= NOISE_FLOOR.get(expected['unit'], 0.0):
+            continue
+        if expected['better'] == 'higher':
+            regressed = value < base * (1 - allowed)
+        else:
+            regressed = value > base * (1 + allowed)
+        if regressed:
+            regressions.append(f"{name}: {value:.4g} {expected['unit']} vs baseline {base:.4g} "
+                               f"(tolerance {allowed:.0%})")
+    return regressions
+
+def print_results(results, baseline):
+    metrics = baseline.get('metrics', {})
+    for name, result in results.items():
+        line = f"{name:55s} {result['value']:>14.4g} {result['unit']}"
+        if name in metrics and metrics[name]['value']:
+            change = result['value'] / metrics[name]['value'] - 1
+            line += f"  ({change:+.1%} vs baseline)"
+        print(line)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark model loading and inference")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help="Allowed relative regression (default: baseline file value or 0.25)")
+    parser.add_argument('--update-baseline', action='store_true', help="Write results as the new baseline")
+    parser.add_argument('--quick', action='store_true', help="Fewer iterations, batches up to 100k")
+    parser.add_argument('--output', help="Also write results to this JSON file")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+
+    results = run_benchmarks(quick=args.quick)
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'tolerance': args.tolerance if args.tolerance is not None else baseline.get('tolerance', DEFAULT_TOLERANCE),
+                'metrics': results
+            }, f, indent=4)
+        print(f"Baseline written to {args.baseline}")
+        sys.exit(0)
+
+    regressions = compare(results, baseline, args.tolerance, skipped_metrics(args.quick)) if baseline else []
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    print("\nNo regressions" if baseline else "\nNo baseline found; run with --update-baseline to create one")
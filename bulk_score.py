@@ -0,0 +1,158 @@
+# bulk_score.py - Streaming Bulk Scoring CLI
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from prediction_function import load_model_and_scaler, predict_student_scores_batch, assign_grades
+from feature_engineering import load_feature_transformer
+from model_artifact import MODEL_ARTIFACT, load_artifact_model_and_scaler
+
+# Per-worker model state, filled in by _init_worker
+_worker_state = {}
+
+def _init_worker(feature_names, transformer_path):
+    """Load the model and feature transformer once per worker process"""
+    if os.path.exists(MODEL_ARTIFACT):
+        model, scaler = load_artifact_model_and_scaler(MODEL_ARTIFACT)
+    else:
+        model, scaler = load_model_and_scaler()
+    _worker_state['model'] = model
+    _worker_state['scaler'] = scaler
+    _worker_state['transformer'] = load_feature_transformer(transformer_path)
+    _worker_state['feature_names'] = feature_names
+
+def score_chunk(chunk, row_ids):
+    """Score one chunk inside a worker and return the output frame"""
+    feature_names = _worker_state['feature_names']
+    # Rows whose features cannot all be derived stay NaN and are scored as blank
+    features = _worker_state['transformer'].transform_features(chunk, feature_names, require_complete=False)
+
+    scores = np.full(len(features), np.nan)
+    valid = features.notna().all(axis=1).to_numpy()
+    if valid.any():
+        scores[valid] = predict_student_scores_batch(
+            _worker_state['model'], _worker_state['scaler'], features[valid], feature_names
+        )
+
+    grades = np.where(valid, assign_grades(np.nan_to_num(scores)), '')
+    return pd.DataFrame({'row_id': row_ids, 'predicted_score': scores, 'grade': grades})
+
+class OutputWriter:
+    """Appends result frames to a CSV or Parquet file"""
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self._parquet_writer = None
+        self._wrote_header = False
+
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, frame):
+        if self.fmt == 'parquet':
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)")
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='a', header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+def _row_ids(chunk, id_column, offset):
+    if id_column:
+        return chunk[id_column].to_numpy()
+    return np.arange(offset, offset + len(chunk))
+
+def run(input_path, output_path, fmt='csv', chunk_size=50000, workers=None,
+        id_column=None, model_info_path='model_info.json',
+        transformer_path='feature_transformer.pkl', progress=True):
+    """
+    Stream input_path in chunks, score them on a process pool and write results
+
+    At most 2 * workers chunks are in flight at any time and results are
+    written in input order as soon as they are ready, so memory use depends on
+    chunk_size and workers, not on the size of the input file.
+
+    Returns:
+    - dict with 'rows', 'seconds' and 'rows_per_second'
+    """
+    with open(model_info_path, 'r') as f:
+        feature_names = json.load(f)['features']
+
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    writer = OutputWriter(output_path, fmt)
+    pending = deque()
+    rows_done = 0
+    offset = 0
+    started = time.perf_counter()
+
+    def drain(limit):
+        nonlocal rows_done
+        while len(pending) > limit:
+            result = pending.popleft().result()
+            writer.write(result)
+            rows_done += len(result)
+            if progress:
+                elapsed = time.perf_counter() - started
+                print(f"\rScored {rows_done:,} rows ({rows_done / elapsed:,.0f} rows/sec)",
+                      end='', file=sys.stderr, flush=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(feature_names, transformer_path)) as pool:
+            for chunk in pd.read_csv(input_path, chunksize=chunk_size):
+                pending.append(pool.submit(score_chunk, chunk, _row_ids(chunk, id_column, offset)))
+                offset += len(chunk)
+                drain(max_in_flight - 1)
+            drain(0)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    if progress:
+        print(file=sys.stderr)
+    return {
+        'rows': rows_done,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows_done / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a raw student CSV in parallel, streaming chunk by chunk")
+    parser.add_argument('input', help="CSV shaped like StudentPerformanceFactors.csv")
+    parser.add_argument('output', help="Output file (.csv or .parquet)")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None,
+                        help="Output format (default: from the output extension)")
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--id-column', default=None, help="Input column to use as row ID (default: row number)")
+    parser.add_argument('--quiet', action='store_true', help="Do not print progress")
+    args = parser.parse_args()
+
+    fmt = args.format or ('parquet' if args.output.endswith('.parquet') else 'csv')
+    summary = run(args.input, args.output, fmt, args.chunk_size, args.workers,
+                  args.id_column, progress=not args.quiet)
+    print(f"Scored {summary['rows']:,} rows in {summary['seconds']}s "
+          f"({summary['rows_per_second']:,.0f} rows/sec) -> {args.output}")
+
+if __name__ == '__main__':
+    main()
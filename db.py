@@ -3,88 +3,366 @@
 import sqlite3
 import hashlib
 import os
+import atexit
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
+from metrics import REGISTRY
+
+# Database methods catch their exceptions and return {'success': False, ...}
+timed = REGISTRY.timed('db_operation_seconds', 'Database method latency',
+                       failed=lambda result: isinstance(result, dict) and result.get('success') is False)
+
+# Applied to every new connection; override per Database with profile={...}
+PERFORMANCE_PROFILE = {
+    'journal_mode': 'WAL',       # readers never wait for the writer
+    'synchronous': 'NORMAL',     # durable at checkpoints; safe with WAL
+    'cache_size': -16000,        # negative = KiB, so ~16 MB page cache
+    'mmap_size': 64 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000         # ms to wait on a lock before SQLITE_BUSY
+}
+
+BUSY_RETRIES = 5
+BUSY_BACKOFF = 0.02
+
+def is_busy_error(error):
+    """True for SQLITE_BUSY / SQLITE_LOCKED surfaced as OperationalError"""
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+INSERT_PREDICTION = '''
+    INSERT INTO predictions (user_id, predicted_score, grade, feature_data, model_version)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+DATABASE_FILE = 'student_predictor.db'
+
+# Recomputes user_stats from the predictions table
+USER_STATS_BACKFILL = '''
+    INSERT INTO user_stats (user_id, prediction_count, score_sum, max_score)
+    SELECT user_id, COUNT(*), SUM(predicted_score), MAX(predicted_score)
+    FROM predictions GROUP BY user_id
+'''
+
+# Ordered (version, description, statements); PRAGMA user_version records
+# the last one applied. Append new migrations, never edit applied ones.
+MIGRATIONS = [
+    (1, 'Initial schema', [
+        # Users table
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            full_name TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP
+        )
+        ''',
+        # Predictions table
+        '''
+        CREATE TABLE IF NOT EXISTS predictions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            predicted_score REAL NOT NULL,
+            grade TEXT,
+            prediction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            feature_data TEXT,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        # User sessions table
+        '''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            session_token TEXT UNIQUE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            expires_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        '''
+    ]),
+    (2, 'Index prediction history by user and date', [
+        # Serves get_user_predictions' WHERE user_id = ? ORDER BY prediction_date DESC
+        # and the per-user aggregates in get_user_stats without a table scan.
+        # sessions.session_token is already covered by its UNIQUE constraint's index.
+        '''
+        CREATE INDEX IF NOT EXISTS idx_predictions_user_date
+        ON predictions (user_id, prediction_date DESC)
+        '''
+    ]),
+    (3, 'Per-user prediction totals', [
+        '''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            prediction_count INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL NOT NULL DEFAULT 0,
+            max_score REAL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        # Every insert path (save_prediction, batched logging, manual SQL) keeps
+        # the totals current in the same transaction as the prediction row
+        '''
+        CREATE TRIGGER IF NOT EXISTS predictions_user_stats
+        AFTER INSERT ON predictions
+        BEGIN
+            INSERT INTO user_stats (user_id, prediction_count, score_sum, max_score)
+            VALUES (NEW.user_id, 1, NEW.predicted_score, NEW.predicted_score)
+            ON CONFLICT (user_id) DO UPDATE SET
+                prediction_count = prediction_count + 1,
+                score_sum = score_sum + excluded.score_sum,
+                max_score = MAX(COALESCE(max_score, excluded.max_score), excluded.max_score);
+        END
+        ''',
+        'DELETE FROM user_stats',
+        USER_STATS_BACKFILL
+    ]),
+    (4, 'Record the model version behind each prediction', [
+        'ALTER TABLE predictions ADD COLUMN model_version TEXT'
+    ])
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+class PoolTimeout(Exception):
+    """No pooled connection became free in time"""
+
+class ConnectionPool:
+    """
+    Bounded pool of long-lived SQLite connections
+
+    Connections are opened lazily up to max_size and handed out one caller
+    at a time, so a connection is never used by two threads at once. Each
+    keeps its own prepared-statement cache between checkouts. Connections
+    that fail with anything other than a constraint error are checked and
+    replaced if broken.
+    """
+
+    def __init__(self, factory, max_size=8, timeout=5.0):
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    def _checkout(self):
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_open(conn):
+                return conn
+            self._discard(conn)
+        with self._lock:
+            if self._created < self.max_size:
+                self._created += 1
+                try:
+                    return self.factory()
+                except Exception:
+                    self._created -= 1
+                    raise
+        try:
+            conn = self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"No database connection free after {self.timeout}s")
+        if self._is_open(conn):
+            return conn
+        self._discard(conn)
+        return self._checkout()
+
+    def _checkin(self, conn, broken=False):
+        if not broken:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                broken = True
+        if broken or self._closed:
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    @staticmethod
+    def _is_open(conn):
+        # Cheap check: any attribute access raises once the connection is closed
+        try:
+            conn.total_changes
+            return True
+        except sqlite3.Error:
+            return False
+
+    @staticmethod
+    def _is_broken(conn):
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return False
+        except sqlite3.Error:
+            return True
+
+    @contextmanager
+    def connection(self):
+        """Check out a connection for the duration of a with-block"""
+        conn = self._checkout()
+        broken = False
+        try:
+            yield conn
+        except sqlite3.IntegrityError:
+            raise
+        except sqlite3.Error:
+            broken = self._is_broken(conn)
+            raise
+        finally:
+            self._checkin(conn, broken)
+
+    def close(self):
+        """Close idle connections; busy ones are closed when checked back in"""
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def stats(self):
+        return {'open': self._created, 'idle': self._idle.qsize(), 'max_size': self.max_size}
+
 class Database:
     """Database handler for user authentication and data storage"""
     
-    def __init__(self, db_name='student_predictor.db'):
-        """Initialize database connection"""
-        self.db_name = db_name
+    def __init__(self, db_name=None, pool_size=8, cached_statements=128, profile=None):
+        """Initialize database connection (db_name defaults to $STUDENT_DB or DATABASE_FILE)"""
+        self.db_name = db_name or os.environ.get('STUDENT_DB', DATABASE_FILE)
+        self.cached_statements = cached_statements
+        self.profile = dict(PERFORMANCE_PROFILE, **(profile or {}))
+        self.pool = ConnectionPool(self.get_connection, max_size=pool_size)
+        atexit.register(self.close)
         self.init_database()
     
     def get_connection(self):
         """Create and return database connection"""
-        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        conn = sqlite3.connect(self.db_name, check_same_thread=False,
+                               cached_statements=self.cached_statements,
+                               timeout=self.profile['busy_timeout'] / 1000)
         conn.row_factory = sqlite3.Row
+        self.apply_profile(conn)
         return conn
     
-    def init_database(self):
-        """Initialize database tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                full_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                last_login TIMESTAMP
-            )
-        ''')
-        
-        # Predictions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS predictions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                predicted_score REAL NOT NULL,
-                grade TEXT,
-                prediction_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                feature_data TEXT,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
+    def apply_profile(self, conn):
+        """Set the performance pragmas (once, when the connection is opened)"""
+        for pragma in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout'):
+            value = self.profile.get(pragma)
+            if value is not None:
+                conn.execute(f'PRAGMA {pragma} = {value}')
+    
+    def _write(self, statements, many=False):
+        """
+        Run (sql, params) statements in one transaction, retrying on SQLITE_BUSY
         
-        # User sessions table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                session_token TEXT UNIQUE NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                expires_at TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
+        busy_timeout already waits for locks; this covers what it cannot,
+        such as a busy error on commit, with jittered exponential backoff.
+        With many=True each params is a list of rows for executemany.
+        Returns the cursor of the last statement.
+        """
+        for attempt in range(BUSY_RETRIES + 1):
+            with self.connection() as conn:
+                try:
+                    cursor = conn.cursor()
+                    for sql, params in statements:
+                        if many:
+                            cursor.executemany(sql, params)
+                        else:
+                            cursor.execute(sql, params)
+                    conn.commit()
+                    return cursor
+                except sqlite3.OperationalError as e:
+                    conn.rollback()
+                    if not is_busy_error(e) or attempt == BUSY_RETRIES:
+                        raise
+            REGISTRY.counter('db_busy_retries', 'Writes retried after SQLITE_BUSY').inc()
+            time.sleep(BUSY_BACKOFF * (2 ** attempt) * (0.5 + random.random()))
+    
+    def connection(self):
+        """Pooled connection as a context manager (rolled back if left uncommitted)"""
+        return self.pool.connection()
+    
+    def close(self):
+        """Shut down the connection pool"""
+        self.pool.close()
+    
+    @timed
+    def init_database(self):
+        """Bring the schema up to SCHEMA_VERSION (no DDL when already current)"""
+        with self.connection() as conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= SCHEMA_VERSION:
+                return
+            
+            # Take the write lock, then re-check: another process may have migrated
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                current = conn.execute('PRAGMA user_version').fetchone()[0]
+                for version, description, statements in MIGRATIONS:
+                    if version <= current:
+                        continue
+                    for statement in statements:
+                        conn.execute(statement)
+                    conn.execute(f'PRAGMA user_version = {version}')
+                if current < SCHEMA_VERSION:
+                    conn.execute('ANALYZE')
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    
+    @timed
+    def rebuild_user_stats(self):
+        """Recompute user_stats from predictions (after manual edits or deletes)"""
+        try:
+            self._write([('DELETE FROM user_stats', ()), (USER_STATS_BACKFILL, ())])
+            return {'success': True, 'message': 'User statistics rebuilt'}
         
-        conn.commit()
-        conn.close()
+        except Exception as e:
+            return {'success': False, 'message': f'Error rebuilding statistics: {str(e)}'}
+    
+    def schema_version(self):
+        """Current PRAGMA user_version of the database file"""
+        with self.connection() as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
     
     def hash_password(self, password):
         """Hash password using SHA-256"""
         return hashlib.sha256(password.encode()).hexdigest()
     
+    @timed
     def create_user(self, username, email, password, full_name=''):
         """Create a new user"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
             hashed_password = self.hash_password(password)
             
-            cursor.execute('''
+            cursor = self._write([('''
                 INSERT INTO users (username, email, password, full_name)
                 VALUES (?, ?, ?, ?)
-            ''', (username, email, hashed_password, full_name))
-            
-            conn.commit()
+            ''', (username, email, hashed_password, full_name))])
             user_id = cursor.lastrowid
-            conn.close()
             
             return {'success': True, 'user_id': user_id, 'message': 'User created successfully'}
         
@@ -98,32 +376,31 @@ class Database:
         except Exception as e:
             return {'success': False, 'message': f'Error: {str(e)}'}
     
+    @timed
     def verify_user(self, username, password):
         """Verify user credentials"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            hashed_password = self.hash_password(password)
-            
-            cursor.execute('''
-                SELECT id, username, email, full_name
-                FROM users
-                WHERE username = ? AND password = ?
-            ''', (username, hashed_password))
-            
-            user = cursor.fetchone()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                hashed_password = self.hash_password(password)
+                
+                cursor.execute('''
+                    SELECT id, username, email, full_name
+                    FROM users
+                    WHERE username = ? AND password = ?
+                ''', (username, hashed_password))
+                
+                user = cursor.fetchone()
             
             if user:
                 # Update last login
-                cursor.execute('''
+                self._write([('''
                     UPDATE users
                     SET last_login = CURRENT_TIMESTAMP
                     WHERE id = ?
-                ''', (user['id'],))
-                conn.commit()
+                ''', (user['id'],))])
                 
-                conn.close()
                 return {
                     'success': True,
                     'user': {
@@ -134,26 +411,25 @@ class Database:
                     }
                 }
             else:
-                conn.close()
                 return {'success': False, 'message': 'Invalid username or password'}
         
         except Exception as e:
             return {'success': False, 'message': f'Error: {str(e)}'}
     
+    @timed
     def get_user_by_id(self, user_id):
         """Get user information by ID"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT id, username, email, full_name, created_at, last_login
-                FROM users
-                WHERE id = ?
-            ''', (user_id,))
-            
-            user = cursor.fetchone()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT id, username, email, full_name, created_at, last_login
+                    FROM users
+                    WHERE id = ?
+                ''', (user_id,))
+                
+                user = cursor.fetchone()
             
             if user:
                 return {
@@ -166,42 +442,51 @@ class Database:
         except Exception as e:
             return {'success': False, 'message': f'Error: {str(e)}'}
     
-    def save_prediction(self, user_id, predicted_score, grade, feature_data=''):
+    @timed
+    def save_prediction(self, user_id, predicted_score, grade, feature_data='', model_version=None):
         """Save prediction to database"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO predictions (user_id, predicted_score, grade, feature_data)
-                VALUES (?, ?, ?, ?)
-            ''', (user_id, predicted_score, grade, feature_data))
-            
-            conn.commit()
+            cursor = self._write([(INSERT_PREDICTION, (user_id, predicted_score, grade, feature_data, model_version))])
             prediction_id = cursor.lastrowid
-            conn.close()
             
             return {'success': True, 'prediction_id': prediction_id}
         
         except Exception as e:
             return {'success': False, 'message': f'Error: {str(e)}'}
     
+    @timed
+    def save_predictions(self, records):
+        """
+        Save many predictions in one transaction
+        
+        Parameters:
+        - records: (user_id, predicted_score, grade, feature_data, model_version) tuples
+        """
+        try:
+            records = list(records)
+            self._write([(INSERT_PREDICTION, records)], many=True)
+            
+            return {'success': True, 'saved': len(records)}
+        
+        except Exception as e:
+            return {'success': False, 'message': f'Error: {str(e)}'}
+    
+    @timed
     def get_user_predictions(self, user_id, limit=10):
         """Get user's prediction history"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT id, predicted_score, grade, prediction_date
-                FROM predictions
-                WHERE user_id = ?
-                ORDER BY prediction_date DESC
-                LIMIT ?
-            ''', (user_id, limit))
-            
-            predictions = cursor.fetchall()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT id, predicted_score, grade, prediction_date
+                    FROM predictions
+                    WHERE user_id = ?
+                    ORDER BY prediction_date DESC
+                    LIMIT ?
+                ''', (user_id, limit))
+                
+                predictions = cursor.fetchall()
             
             return {
                 'success': True,
@@ -211,28 +496,28 @@ class Database:
         except Exception as e:
             return {'success': False, 'message': f'Error: {str(e)}'}
     
+    @timed
     def update_user_profile(self, user_id, full_name=None, email=None):
         """Update user profile"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
+            statements = []
             
             if full_name:
-                cursor.execute('''
+                statements.append(('''
                     UPDATE users
                     SET full_name = ?
                     WHERE id = ?
-                ''', (full_name, user_id))
+                ''', (full_name, user_id)))
             
             if email:
-                cursor.execute('''
+                statements.append(('''
                     UPDATE users
                     SET email = ?
                     WHERE id = ?
-                ''', (email, user_id))
+                ''', (email, user_id)))
             
-            conn.commit()
-            conn.close()
+            if statements:
+                self._write(statements)
             
             return {'success': True, 'message': 'Profile updated successfully'}
         
@@ -241,64 +526,52 @@ class Database:
         except Exception as e:
             return {'success': False, 'message': f'Error: {str(e)}'}
     
+    @timed
     def change_password(self, user_id, old_password, new_password):
         """Change user password"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Verify old password
-            old_hashed = self.hash_password(old_password)
-            cursor.execute('''
-                SELECT id FROM users
-                WHERE id = ? AND password = ?
-            ''', (user_id, old_hashed))
-            
-            if not cursor.fetchone():
-                conn.close()
-                return {'success': False, 'message': 'Old password is incorrect'}
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Verify old password
+                old_hashed = self.hash_password(old_password)
+                cursor.execute('''
+                    SELECT id FROM users
+                    WHERE id = ? AND password = ?
+                ''', (user_id, old_hashed))
+                
+                if not cursor.fetchone():
+                    return {'success': False, 'message': 'Old password is incorrect'}
             
             # Update to new password
             new_hashed = self.hash_password(new_password)
-            cursor.execute('''
+            self._write([('''
                 UPDATE users
                 SET password = ?
                 WHERE id = ?
-            ''', (new_hashed, user_id))
-            
-            conn.commit()
-            conn.close()
+            ''', (new_hashed, user_id))])
             
             return {'success': True, 'message': 'Password changed successfully'}
         
         except Exception as e:
             return {'success': False, 'message': f'Error: {str(e)}'}
     
+    @timed
     def get_user_stats(self, user_id):
         """Get user statistics"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            
-            # Total predictions
-            cursor.execute('''
-                SELECT COUNT(*) as total FROM predictions WHERE user_id = ?
-            ''', (user_id,))
-            total = cursor.fetchone()['total']
-            
-            # Average score
-            cursor.execute('''
-                SELECT AVG(predicted_score) as avg_score FROM predictions WHERE user_id = ?
-            ''', (user_id,))
-            avg_score = cursor.fetchone()['avg_score'] or 0
-            
-            # Highest score
-            cursor.execute('''
-                SELECT MAX(predicted_score) as max_score FROM predictions WHERE user_id = ?
-            ''', (user_id,))
-            max_score = cursor.fetchone()['max_score'] or 0
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                
+                # Running totals kept by the predictions insert trigger
+                cursor.execute('''
+                    SELECT prediction_count, score_sum, max_score FROM user_stats WHERE user_id = ?
+                ''', (user_id,))
+                row = cursor.fetchone()
             
-            conn.close()
+            total = row['prediction_count'] if row else 0
+            avg_score = row['score_sum'] / total if total else 0
+            max_score = (row['max_score'] or 0) if row else 0
             
             return {
                 'success': True,
@@ -310,4 +583,21 @@ class Database:
             }
         
         except Exception as e:
-            return {'success': False, 'message': f'Error: {str(e)}'}
\ No newline at end of file
+            return {'success': False, 'message': f'Error: {str(e)}'}
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Database maintenance")
+    parser.add_argument('--db', default=None, help="Database file (default: $STUDENT_DB or student_predictor.db)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('migrate', help="Apply pending schema migrations")
+    subparsers.add_parser('rebuild-stats', help="Recompute per-user prediction totals")
+    args = parser.parse_args()
+    
+    db = Database(args.db)
+    if args.command == 'migrate':
+        # Database() already migrated on open
+        print(f"Schema version {db.schema_version()} (latest {SCHEMA_VERSION})")
+    elif args.command == 'rebuild-stats':
+        print(db.rebuild_user_stats()['message'])
@@ -0,0 +1,112 @@
+# db_concurrency_check.py - Reader/Writer Concurrency Check for db.Database
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from db import Database
+
+def run_check(profile=None, readers=4, writers=2, duration=3.0, hold_write_lock=0.2):
+    """
+    Run readers against writers that hold write transactions open
+
+    Each writer repeatedly takes the write lock (BEGIN EXCLUSIVE), inserts a
+    prediction, sleeps hold_write_lock seconds inside the transaction and
+    commits; between those, save_prediction and verify_user run through the
+    normal retrying write path. Readers call get_user_predictions and
+    get_user_stats in a loop and record their latency.
+
+    Returns:
+    - dict of reader latency percentiles (ms), reads/writes completed and
+      errors seen on each side
+    """
+    directory = tempfile.mkdtemp(prefix='db_check_')
+    path = os.path.join(directory, 'check.db')
+    db = Database(path, pool_size=readers + writers + 2, profile=profile)
+    db.create_user('reader', 'reader@example.com', 'password1')
+    user_id = db.verify_user('reader', 'password1')['user']['id']
+    for i in range(200):
+        db.save_prediction(user_id, 60 + i % 40, 'B')
+
+    stop = threading.Event()
+    latencies, errors = [], {'read': 0, 'write': 0}
+    writes = [0]
+    lock = threading.Lock()
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            ok = db.get_user_predictions(user_id)['success'] and db.get_user_stats(user_id)['success']
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors['read'] += 1
+
+    def writer():
+        conn = db.get_connection()
+        while not stop.is_set():
+            try:
+                conn.execute('BEGIN EXCLUSIVE')
+                conn.execute('INSERT INTO predictions (user_id, predicted_score, grade) VALUES (?, ?, ?)',
+                             (user_id, 75.0, 'B'))
+                time.sleep(hold_write_lock)
+                conn.commit()
+                ok = db.save_prediction(user_id, 80.0, 'A')['success'] and \
+                    db.verify_user('reader', 'password1')['success']
+            except sqlite3.OperationalError:
+                conn.rollback()
+                ok = False
+            with lock:
+                writes[0] += 1
+                if not ok:
+                    errors['write'] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    db.close()
+
+    p50, p99, worst = np.percentile(latencies, [50, 99, 100]) if latencies else (0, 0, 0)
+    return {
+        'journal_mode': db.profile['journal_mode'],
+        'reads': len(latencies),
+        'writes': writes[0],
+        'read_p50_ms': round(float(p50), 3),
+        'read_p99_ms': round(float(p99), 3),
+        'read_max_ms': round(float(worst), 3),
+        'read_errors': errors['read'],
+        'write_errors': errors['write']
+    }
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Check that readers never block behind writers")
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--hold', type=float, default=0.2, help="Seconds each writer holds the write lock")
+    parser.add_argument('--compare', action='store_true', help="Also run with the rollback journal for contrast")
+    args = parser.parse_args()
+
+    result = run_check(duration=args.duration, hold_write_lock=args.hold)
+    print(result)
+    if args.compare:
+        print(run_check({'journal_mode': 'DELETE'}, duration=args.duration, hold_write_lock=args.hold))
+
+    # Readers must finish well inside a single write-lock hold and never fail
+    blocked = result['read_max_ms'] >= args.hold * 1000 / 2
+    if blocked or result['read_errors'] or result['write_errors']:
+        print("FAIL: readers blocked behind writers or operations failed")
+        sys.exit(1)
+    print("OK: readers never waited for the write lock")
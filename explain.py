@@ -0,0 +1,95 @@
+# explain.py - Exact Additive Contributions for the Quadratic Model
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from model_compiler import compile_quadratic_model
+
+def scaled_form(model):
+    """QuadraticModel over standardized inputs for a pipeline or ArtifactModel"""
+    if hasattr(model, 'quadratic'):
+        return model.quadratic
+    return compile_quadratic_model(model)
+
+def explain_scaled(quadratic, Z, feature_names):
+    """
+    Split predictions into exact per-feature and per-interaction parts
+
+    Over standardized inputs z the model is c + g·z + z·Q·z, and z = 0 is the
+    average training student, so c is the baseline score. Each feature owns
+    its linear and squared terms (g_i*z_i + Q_ii*z_i^2) and each pair owns
+    its cross term (2*Q_ij*z_i*z_j). The parts sum exactly to the raw
+    prediction. Splitting every cross term equally between its two features
+    gives 'feature_totals', which are the exact Shapley values for this
+    model against the average-student baseline.
+
+    Parameters:
+    - quadratic: QuadraticModel over standardized inputs (scaled_form)
+    - Z: 2-D array of standardized rows
+    - feature_names: Model feature order
+
+    Returns:
+    - dict with 'feature_names', 'base_value', 'predictions' (raw,
+      unclipped), 'features' (n x d), 'interactions' (n x pairs),
+      'interaction_names' and 'feature_totals' (n x d)
+    """
+    Z = np.atleast_2d(np.asarray(Z, dtype=float))
+    g, Q = quadratic.b, quadratic.A
+
+    features = Z * g + Z * Z * np.diag(Q)
+
+    pairs = list(itertools.combinations(range(len(g)), 2))
+    first = np.array([i for i, _ in pairs], dtype=int)
+    second = np.array([j for _, j in pairs], dtype=int)
+    interactions = 2 * Q[first, second] * Z[:, first] * Z[:, second]
+
+    # Half of each cross term to each of its features
+    feature_totals = features.copy()
+    np.add.at(feature_totals.T, first, interactions.T / 2)
+    np.add.at(feature_totals.T, second, interactions.T / 2)
+
+    return {
+        'feature_names': list(feature_names),
+        'base_value': quadratic.c,
+        'predictions': quadratic.c + features.sum(axis=1) + interactions.sum(axis=1),
+        'features': features,
+        'interactions': interactions,
+        'interaction_names': [(feature_names[i], feature_names[j]) for i, j in pairs],
+        'feature_totals': feature_totals
+    }
+
+def explain_predictions(model, scaler, feature_rows, feature_names):
+    """
+    Contributions for raw feature rows (same inputs as predict_student_scores_batch)
+
+    Scores shown to users are clipped to 0-100; 'predictions' here are the
+    unclipped values the contributions add up to.
+    """
+    if isinstance(feature_rows, pd.DataFrame):
+        input_df = feature_rows.loc[:, list(feature_names)]
+    else:
+        values = np.atleast_2d(np.asarray(feature_rows, dtype=float))
+        input_df = pd.DataFrame(values, columns=feature_names)
+    return explain_scaled(scaled_form(model), scaler.transform(input_df), list(feature_names))
+
+def contribution_items(explanation, row=0, min_interaction=0.05):
+    """
+    Waterfall-ready (label, value) steps for one row
+
+    Feature steps come first, largest magnitude first, followed by the
+    interactions larger than min_interaction points and one step that
+    collects the remaining small interactions.
+    """
+    features = explanation['features'][row]
+    interactions = explanation['interactions'][row]
+
+    items = sorted(zip(explanation['feature_names'], features.tolist()), key=lambda item: -abs(item[1]))
+    large = [(f"{a} × {b}", value) for (a, b), value in zip(explanation['interaction_names'], interactions.tolist())
+             if abs(value) >= min_interaction]
+    items += sorted(large, key=lambda item: -abs(item[1]))
+    remainder = sum(value for value in interactions.tolist() if abs(value) < min_interaction)
+    if abs(remainder) >= 0.005:
+        items.append(("Other interactions", remainder))
+    return items
@@ -0,0 +1,137 @@
+# feature_engineering.py - Raw Record to Model Feature Transformer
+
+import joblib
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = 'Exam_Score'
+
+class StudentFeatureTransformer:
+    """
+    The cleaning and encoding steps from scr.ipynb as a fit-once transformer
+
+    fit() learns, from the raw training data:
+    - medians for numeric columns and modes for categorical columns
+      (used to fill missing values)
+    - IQR outlier bounds (Q1 - 1.5*IQR, Q3 + 1.5*IQR) for numeric columns
+    - the category levels seen for each categorical column
+
+    transform() then applies the same steps to any DataFrame or chunk,
+    one column at a time, and produces the columns of
+    cleaned_student_data.csv: numeric columns, Study_Efficiency and the
+    drop_first one-hot columns of pd.get_dummies.
+    """
+
+    def __init__(self, clip_outliers=False):
+        """
+        Parameters:
+        - clip_outliers: Clip numeric inputs to the fitted IQR bounds. The
+          notebook only reports outliers, so this is off by default.
+        """
+        self.clip_outliers = clip_outliers
+        self.numeric_columns = []
+        self.categorical_columns = []
+        self.medians = {}
+        self.modes = {}
+        self.iqr_bounds = {}
+        self.categories = {}
+        self.output_columns = []
+        self.is_fitted = False
+
+    def fit(self, df):
+        """Learn imputation values, outlier bounds and category levels"""
+        self.numeric_columns = df.select_dtypes(include=[np.number]).columns.tolist()
+        self.categorical_columns = df.select_dtypes(include=['object', 'category']).columns.tolist()
+
+        for col in self.numeric_columns:
+            self.medians[col] = float(df[col].median())
+            q1, q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+            iqr = q3 - q1
+            self.iqr_bounds[col] = (float(q1 - 1.5 * iqr), float(q3 + 1.5 * iqr))
+
+        for col in self.categorical_columns:
+            self.modes[col] = df[col].mode()[0]
+            self.categories[col] = sorted(df[col].dropna().unique().tolist())
+
+        self.output_columns = list(self.numeric_columns)
+        if 'Study_Efficiency' not in self.output_columns:
+            self.output_columns.append('Study_Efficiency')
+        for col in self.categorical_columns:
+            self.output_columns.extend(f"{col}_{level}" for level in self.categories[col][1:])
+
+        self.is_fitted = True
+        return self
+
+    def _numeric(self, df, col):
+        values = pd.to_numeric(df[col], errors='coerce') if col in df.columns else pd.Series(np.nan, index=df.index)
+        values = values.fillna(self.medians[col])
+        if self.clip_outliers:
+            low, high = self.iqr_bounds[col]
+            values = values.clip(low, high)
+        return values
+
+    def transform(self, df):
+        """Apply the fitted cleaning, derivation and encoding to a DataFrame"""
+        if not self.is_fitted:
+            raise RuntimeError("StudentFeatureTransformer must be fitted before transform")
+
+        columns = {}
+        for col in self.numeric_columns:
+            if col in df.columns or col != TARGET_COLUMN:
+                columns[col] = self._numeric(df, col)
+
+        # Study efficiency ratio (+1 avoids division by zero)
+        if 'Study_Efficiency' in df.columns:
+            columns['Study_Efficiency'] = pd.to_numeric(df['Study_Efficiency'], errors='coerce')
+        elif TARGET_COLUMN in df.columns:
+            columns['Study_Efficiency'] = columns[TARGET_COLUMN] / (columns['Hours_Studied'] + 1)
+        else:
+            columns['Study_Efficiency'] = pd.Series(np.nan, index=df.index)
+
+        for col in self.categorical_columns:
+            values = df[col] if col in df.columns else pd.Series(np.nan, index=df.index)
+            values = values.astype(object).where(values.notna(), self.modes[col])
+            for level in self.categories[col][1:]:
+                columns[f"{col}_{level}"] = (values == level).to_numpy()
+
+        output = [col for col in self.output_columns if col in columns]
+        return pd.DataFrame(columns, index=df.index)[output]
+
+    def transform_features(self, df, feature_names, require_complete=True):
+        """
+        Transform raw records and return only the model input columns
+
+        With require_complete=False, rows whose Study_Efficiency cannot be
+        derived are left as NaN for the caller to skip instead of raising.
+        """
+        transformed = self.transform(df)
+        missing = [name for name in feature_names if name not in transformed.columns]
+        if missing:
+            raise ValueError(f"Cannot build model features: {', '.join(missing)}")
+        features = transformed[list(feature_names)]
+        if require_complete and 'Study_Efficiency' in features.columns and features['Study_Efficiency'].isna().any():
+            raise ValueError("Study_Efficiency needs either a Study_Efficiency or an Exam_Score column")
+        return features
+
+    def save(self, path='feature_transformer.pkl'):
+        """Serialize next to the model files"""
+        joblib.dump(self, path)
+
+def load_feature_transformer(path='feature_transformer.pkl'):
+    """Load the fitted transformer saved alongside the model"""
+    return joblib.load(path)
+
+if __name__ == '__main__':
+    # Pickle the class under its module name, not __main__
+    from feature_engineering import StudentFeatureTransformer
+
+    raw = pd.read_csv('StudentPerformanceFactors.csv')
+    transformer = StudentFeatureTransformer().fit(raw)
+    transformer.save()
+
+    cleaned = pd.read_csv('cleaned_student_data.csv')
+    transformed = transformer.transform(raw)
+    matches = transformed.columns.tolist() == cleaned.columns.tolist() and np.allclose(
+        transformed.to_numpy(dtype=float), cleaned.to_numpy(dtype=float)
+    )
+    print(f"Saved feature_transformer.pkl; matches cleaned_student_data.csv: {matches}")
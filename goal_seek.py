@@ -0,0 +1,204 @@
+# goal_seek.py - Closed-Form Goal Seeking on the Quadratic Model
+
+import numpy as np
+
+from prediction_function import GRADE_THRESHOLDS
+
+def target_for_grade(grade):
+    """Lowest score that earns a grade from get_grade_info's bands"""
+    for bound, name in GRADE_THRESHOLDS:
+        if name == grade:
+            return float(bound)
+    raise ValueError(f"Unknown target grade '{grade}'")
+
+def _secular_root(phi, low, high, iterations=200):
+    """Bisect an increasing phi on [low, high]; returns a point with phi >= 0"""
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        if phi(mid) >= 0:
+            high = mid
+        else:
+            low = mid
+        if high - low <= 1e-15 * max(1.0, high):
+            break
+    return high
+
+def _min_norm_step(Q, g, gap, eps=1e-12):
+    """
+    Global minimizer of ||z|| subject to z·Q·z + g·z >= gap (gap > 0)
+
+    Returns (z, mu) with mu the constraint's multiplier, or None when the
+    gap cannot be closed.
+
+    A norm objective with a single quadratic constraint has no duality gap,
+    so the KKT point with multiplier mu > 0 and I - mu*Q positive
+    semidefinite is the global optimum. In Q's eigenbasis (Q = V diag(lam) V',
+    h = V'g) that point is z_i = (mu/2) h_i / (1 - mu*lam_i), and the
+    constraint becomes the secular equation
+        sum_i h_i^2 * mu * (2 - mu*lam_i) / (4 * (1 - mu*lam_i)^2) = gap,
+    whose left side increases with mu on [0, 1/max(lam)).
+    """
+    lam, V = np.linalg.eigh(Q)
+    h = V.T @ g
+    h2 = h * h
+    scale = max(1.0, float(np.abs(lam).max(initial=0.0)))
+    lam_max = float(lam[-1]) if lam.size else 0.0
+
+    def reached(mu):
+        u = 1 - mu * lam
+        return float(np.sum(h2 * mu * (2 - mu * lam) / (4 * u * u))) - gap
+
+    def step(mu):
+        return V @ (mu / 2 * h / (1 - mu * lam))
+
+    if lam_max > eps * scale:
+        mu_max = 1 / lam_max
+        top = lam >= lam_max - eps * scale
+        if np.any(h2[top] > eps * eps):
+            # Regular case: reached() runs from -gap to +inf below mu_max
+            upper = mu_max * (1 - 1e-12)
+            if reached(upper) >= 0:
+                mu = _secular_root(reached, 0.0, upper)
+                return step(mu), mu
+
+        # Hard case: g has (almost) no component along the top eigenvectors. Follow
+        # the secular curve to mu_max, then add the missing amount along a
+        # top eigenvector (curvature lam_max there, so the norm cost is least)
+        mu = mu_max
+        rest = ~top
+        z = V[:, rest] @ (mu / 2 * h[rest] / (1 - mu * lam[rest]))
+        short = gap - (z @ Q @ z + g @ z)
+        if short <= 0:
+            mu = _secular_root(reached, 0.0, mu_max * (1 - 1e-12))
+            return step(mu), mu
+        return z + np.sqrt(short / lam_max) * V[:, -1], mu
+
+    # Concave (or flat) in every direction: reached() approaches a finite
+    # limit unless g has a component on a zero-curvature direction
+    flat = np.abs(lam) <= eps * scale
+    if not np.any(h2[flat] > eps * eps):
+        limit = float(np.sum(h2[~flat] / (-4 * lam[~flat])))
+        if limit < gap * (1 + 1e-9):
+            return None
+    upper = 1.0
+    while reached(upper) < 0:
+        upper *= 2
+        if upper > 1e12:
+            return None
+    mu = _secular_root(reached, 0.0, upper)
+    return step(mu), mu
+
+def seek_goal(kernel, values, feature_names, feature_info, target_score,
+              adjustable=None, max_changes=None, max_iterations=None):
+    """
+    Least-effort change to chosen features that lifts the prediction to target_score
+
+    Effort is the change measured in standard deviations (feature_info std),
+    i.e. the norm of (new - current) / std. Without binding bounds the
+    answer is the exact global minimum, found from the KKT conditions of
+    the one-constraint quadratic problem (see _min_norm_step). When the
+    optimum would leave a feature's allowed range, that feature is pinned
+    at the bound and the rest are re-solved exactly (active set); pinned
+    features whose multiplier says they should move back inside are
+    released again. The result always respects every bound.
+
+    Parameters:
+    - kernel: Raw-space QuadraticModel (model_compiler.kernel_for)
+    - values: Current feature vector in feature_names order
+    - feature_info: Contents of feature_info.json (min/max/std per feature)
+    - target_score: Score to reach (e.g. target_for_grade('A'))
+    - adjustable: Feature names allowed to change (default: all)
+    - max_changes: Optional {feature: max absolute change} effort budget
+    - max_iterations: Active-set iterations (default: twice the feature count)
+
+    Returns:
+    - dict with 'success', and on success 'changes', 'new_values',
+      'predicted_score' and 'effort'; otherwise 'message'
+    """
+    x0 = np.asarray(values, dtype=float)
+    adjustable = list(adjustable) if adjustable else list(feature_names)
+    max_changes = max_changes or {}
+
+    low = np.array([feature_info[name]['min'] for name in feature_names], dtype=float)
+    high = np.array([feature_info[name]['max'] for name in feature_names], dtype=float)
+    scale = np.array([feature_info[name].get('std') or (feature_info[name]['max'] - feature_info[name]['min'])
+                      for name in feature_names], dtype=float)
+    for i, name in enumerate(feature_names):
+        if name not in adjustable:
+            low[i] = high[i] = x0[i]
+        elif name in max_changes:
+            low[i] = max(low[i], x0[i] - max_changes[name])
+            high[i] = min(high[i], x0[i] + max_changes[name])
+    # Inputs already outside the box stay where they are unless moved inside it
+    low, high = np.minimum(low, x0), np.maximum(high, x0)
+
+    A, b = kernel.A, kernel.b
+
+    def result(x):
+        score = float(kernel.predict_one(x))
+        delta = x - x0
+        return {
+            'success': True,
+            'target': float(target_score),
+            'predicted_score': round(max(0, min(100, score)), 2),
+            'changes': {name: float(delta[i]) for i, name in enumerate(feature_names) if abs(delta[i]) > 1e-9},
+            'new_values': {name: float(x[i]) for i, name in enumerate(feature_names)},
+            'effort': float(np.linalg.norm(delta / scale))
+        }
+
+    if kernel.predict_one(x0) >= target_score:
+        return result(x0)
+
+    movable = high > low
+    pinned = np.zeros(len(x0), dtype=bool)
+    pin_values = x0.copy()
+    best = None
+    for _ in range(max_iterations or 2 * len(x0) + 2):
+        # Pinned features sit at the bound they crossed; solve exactly for
+        # the rest in std units around that point
+        free = movable & ~pinned
+        base = np.where(pinned, pin_values, x0)
+        gap = target_score - kernel.predict_one(base)
+        if gap <= 0:
+            z, mu = np.zeros(int(free.sum())), 0.0
+        elif not free.any():
+            break
+        else:
+            D = scale[free]
+            Q = A[np.ix_(free, free)] * np.outer(D, D)
+            g = (2 * A @ base + b)[free] * D
+            solution = _min_norm_step(Q, g, gap)
+            if solution is None:
+                break
+            z, mu = solution
+
+        x = base.copy()
+        x[free] += scale[free] * z
+        below, above = free & (x < low), free & (x > high)
+        if below.any() or above.any():
+            pin_values[below], pin_values[above] = low[below], high[above]
+            pinned |= below | above
+            continue
+        best = x
+
+        # KKT check on the bounds: a pinned feature's multiplier must push
+        # it outwards, otherwise moving it back inside lowers the effort
+        multiplier = mu * (2 * A @ x + b) - 2 * (x - x0) / scale ** 2
+        tol = 1e-9 * max(1.0, float(np.abs(multiplier).max(initial=0.0)))
+        release = pinned & (((pin_values == high) & (multiplier < -tol)) |
+                            ((pin_values == low) & (multiplier > tol)))
+        if not release.any():
+            return result(x)
+        pinned &= ~release
+
+    if best is not None:
+        return result(best)
+    return {
+        'success': False,
+        'target': float(target_score),
+        'message': 'Target is not reachable within the allowed feature ranges'
+    }
+
+def seek_single_feature(kernel, values, feature_names, feature_info, target_score, feature):
+    """Exact minimal change of one feature to reach target_score"""
+    return seek_goal(kernel, values, feature_names, feature_info, target_score, adjustable=[feature])
@@ -0,0 +1,337 @@
+# inference_server.py - Standalone HTTP Scoring Service
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import queue
+import signal
+import time
+
+import numpy as np
+
+from prediction_function import load_model_and_scaler
+from model_compiler import compile_quadratic_model
+from model_artifact import MODEL_ARTIFACT, load_model_artifact
+from micro_batcher import MicroBatchDispatcher
+from metrics import REGISTRY as METRICS
+from admission import API_ADMISSION, Overloaded
+
+MAX_BODY_BYTES = 8 * 1024 * 1024
+MAX_BATCH_ROWS = 100000
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    429: 'Too Many Requests',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable'
+}
+
+class RequestError(Exception):
+    """Client error that maps to an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class ScoringService:
+    """Model loaded once per process plus the JSON request handlers"""
+
+    def __init__(self, model_info_path='model_info.json', max_batch_size=0, max_wait_ms=2.0):
+        """
+        Load the model (artifact if present, else the pickles) and its kernel
+
+        With max_batch_size > 1, single predictions are coalesced by a
+        MicroBatchDispatcher instead of being scored one at a time.
+        """
+        with open(model_info_path, 'r') as f:
+            self.model_info = json.load(f)
+
+        self.feature_names = self.model_info['features']
+        with METRICS.timer('model_load_seconds', 'Model load latency', operation='scoring_service'):
+            if os.path.exists(MODEL_ARTIFACT):
+                artifact = load_model_artifact(MODEL_ARTIFACT)
+                self.model, self.scaler = artifact.model, artifact.scaler
+                self.kernel = artifact.kernel
+            else:
+                self.model, self.scaler = load_model_and_scaler()
+                self.kernel = compile_quadratic_model(self.model, self.scaler)
+        self.dispatcher = None
+        if max_batch_size > 1:
+            self.dispatcher = MicroBatchDispatcher(self.kernel.predict_scores, max_batch_size, max_wait_ms, name='api')
+        self.started_at = time.time()
+        self.request_count = 0
+
+    def _row(self, item):
+        """Turn a {name: value} dict or a list of values into an ordered row"""
+        if isinstance(item, dict):
+            missing = [name for name in self.feature_names if name not in item]
+            if missing:
+                raise RequestError(400, f"Missing features: {', '.join(missing)}")
+            values = [item[name] for name in self.feature_names]
+        elif isinstance(item, list):
+            if len(item) != len(self.feature_names):
+                raise RequestError(400, f"Expected {len(self.feature_names)} feature values, got {len(item)}")
+            values = item
+        else:
+            raise RequestError(400, "Features must be an object or a list")
+
+        try:
+            row = [float(v) for v in values]
+        except (TypeError, ValueError):
+            raise RequestError(400, "Feature values must be numbers")
+        # json.loads accepts NaN and Infinity, which would score as garbage
+        if not all(math.isfinite(v) for v in row):
+            raise RequestError(400, "Feature values must be finite numbers")
+        return row
+
+    def predict(self, payload):
+        """Score a single student: {"features": {...} | [...]}"""
+        if not isinstance(payload, dict) or 'features' not in payload:
+            raise RequestError(400, "Body must be a JSON object with 'features'")
+        row = self._row(payload['features'])
+        if self.dispatcher is not None:
+            return self._await_batched(row)
+        return {'success': True, 'predicted_score': self.kernel.predict_score(row)}
+
+    async def _await_batched(self, row):
+        try:
+            future = self.dispatcher.submit(row)
+        except queue.Full:
+            raise RequestError(503, "Scoring queue is full; retry shortly")
+        score = await asyncio.wrap_future(future)
+        return {'success': True, 'predicted_score': score}
+
+    def predict_batch(self, payload):
+        """Score many students: {"instances": [{...} | [...], ...]}"""
+        if not isinstance(payload, dict) or not isinstance(payload.get('instances'), list):
+            raise RequestError(400, "Body must be a JSON object with an 'instances' list")
+        instances = payload['instances']
+        if len(instances) > MAX_BATCH_ROWS:
+            raise RequestError(413, f"At most {MAX_BATCH_ROWS} instances per batch")
+        if not instances:
+            return {'success': True, 'predicted_scores': []}
+
+        rows = np.array([self._row(item) for item in instances], dtype=float)
+        scores = self.kernel.predict_scores(rows)
+        return {'success': True, 'predicted_scores': scores.tolist()}
+
+    def health(self):
+        """Liveness and model metadata"""
+        health = {
+            'status': 'ok',
+            'model_type': self.model_info.get('model_type'),
+            'features': self.feature_names,
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'requests_served': self.request_count
+        }
+        if self.dispatcher is not None:
+            health['micro_batching'] = self.dispatcher.stats()
+        return health
+
+    def close(self):
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+
+class InferenceServer:
+    """Minimal HTTP/1.1 server on asyncio streams with keep-alive"""
+
+    def __init__(self, service, host='127.0.0.1', port=8000, shutdown_timeout=10.0):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.shutdown_timeout = shutdown_timeout
+        self.routes = {
+            ('GET', '/health'): lambda body: service.health(),
+            ('GET', '/metrics'): lambda body: METRICS.render_prometheus(),
+            ('POST', '/predict'): service.predict,
+            ('POST', '/predict/batch'): service.predict_batch
+        }
+        self._server = None
+        self._connections = set()
+        self._busy = set()
+        self._stopping = None
+
+    async def _read_request(self, reader):
+        """Parse one request; returns (method, path, keep_alive, body) or None on EOF"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise RequestError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0) or 0)
+        except ValueError:
+            raise RequestError(400, "Invalid Content-Length")
+        if length < 0:
+            raise RequestError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413, "Request body too large")
+        body = await reader.readexactly(length) if length else b''
+
+        path = target.split('?', 1)[0]
+        keep_alive = headers.get('connection', '').lower() != 'close' and version != 'HTTP/1.0'
+        return method.upper(), path, keep_alive, body
+
+    async def _dispatch(self, method, path, body, client=None):
+        """Route a request and return (status, payload)"""
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                return 405, {'success': False, 'message': 'Method not allowed'}
+            return 404, {'success': False, 'message': 'Not found'}
+
+        if method != 'POST':
+            return await self._call(handler, path, body)
+        # Scoring routes are rate limited per client address, with a global concurrency cap
+        try:
+            API_ADMISSION.acquire(f"ip:{client}" if client else None)
+        except Overloaded as e:
+            return 429, {'success': False, 'message': str(e), 'retry_after': e.retry_after}
+        try:
+            return await self._call(handler, path, body)
+        finally:
+            API_ADMISSION.release()
+
+    async def _call(self, handler, path, body):
+        """Decode the body, run the handler and map errors to statuses"""
+        payload = None
+        if body:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                return 400, {'success': False, 'message': 'Invalid JSON body'}
+
+        started = time.perf_counter()
+        try:
+            result = handler(payload)
+            if asyncio.iscoroutine(result):
+                result = await result
+        except RequestError as e:
+            return e.status, {'success': False, 'message': e.message}
+        except Exception as e:
+            return 500, {'success': False, 'message': f'Error: {str(e)}'}
+        finally:
+            METRICS.histogram('http_request_seconds', 'Request handling latency', route=path).observe(
+                time.perf_counter() - started)
+
+        self.service.request_count += 1
+        return 200, result
+
+    async def _write_response(self, writer, status, payload, keep_alive):
+        # Plain strings (the /metrics exposition) go out as text, everything else as JSON
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        peer = writer.get_extra_info('peername')
+        client = peer[0] if peer else None
+        try:
+            while not self._stopping.is_set():
+                try:
+                    request = await self._read_request(reader)
+                except RequestError as e:
+                    await self._write_response(writer, e.status, {'success': False, 'message': e.message}, False)
+                    break
+                except (asyncio.IncompleteReadError, ValueError):
+                    break
+                if request is None:
+                    break
+
+                self._busy.add(task)
+                try:
+                    method, path, keep_alive, body = request
+                    keep_alive = keep_alive and not self._stopping.is_set()
+                    status, payload = await self._dispatch(method, path, body, client)
+                    await self._write_response(writer, status, payload, keep_alive)
+                finally:
+                    self._busy.discard(task)
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def serve(self):
+        """Run until SIGINT/SIGTERM, then drain in-flight requests"""
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self._stopping.set)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        print(f"Serving on http://{self.host}:{self.port}")
+
+        async with self._server:
+            await self._stopping.wait()
+            await self.shutdown()
+
+    async def shutdown(self):
+        """Stop accepting, let busy connections finish, then close idle ones"""
+        self._stopping.set()
+        self._server.close()
+
+        deadline = time.monotonic() + self.shutdown_timeout
+        while self._busy and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        for task in list(self._connections):
+            task.cancel()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+        self.service.close()
+        print("Server stopped")
+
+def main():
+    parser = argparse.ArgumentParser(description="Student score HTTP inference service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--shutdown-timeout', type=float, default=10.0,
+                        help="Seconds to wait for in-flight requests on shutdown")
+    parser.add_argument('--max-batch-size', type=int, default=0,
+                        help="Coalesce concurrent /predict calls into batches of up to this size (0 disables)")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help="Longest time a /predict call waits for a batch to fill")
+    args = parser.parse_args()
+
+    service = ScoringService(max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    server = InferenceServer(service, args.host, args.port, args.shutdown_timeout)
+    asyncio.run(server.serve())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# live_preview.py - Speculative Scoring for the Predictor Form
+
+class SpeculativeScorer:
+    """
+    Scores form input as it changes and remembers the latest result
+
+    Unchanged input is never rescored, and the results page can reuse the
+    score when it was computed for exactly the submitted input.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.score = None
+        self.evaluations = 0
+
+    def update(self, key, values, score_fn):
+        """
+        Offer the current input
+
+        Parameters:
+        - key: Hashable identity of the input (values plus model identity)
+        - values: Feature vector to score
+        - score_fn: Callable returning the score for values
+
+        Returns:
+        - The score for values
+        """
+        if key != self.key:
+            self.score = score_fn(values)
+            self.key = key
+            self.evaluations += 1
+        return self.score
+
+    def result_for(self, key):
+        """The speculative score if it was computed for exactly this input"""
+        return self.score if key == self.key else None
+
+def fill_missing(values, feature_names, feature_info):
+    """
+    Replace blank inputs with the training mean; returns (values, missing count)
+
+    The one fill policy for blank form fields, used by both the live preview
+    and "Predict My Score" so the two always agree.
+    """
+    filled, missing = [], 0
+    for value, name in zip(values, feature_names):
+        if value is None:
+            filled.append(float(feature_info[name]['mean']))
+            missing += 1
+        else:
+            filled.append(float(value))
+    return filled, missing
@@ -0,0 +1,269 @@
+# metrics.py - In-Process Metrics Registry with Prometheus Text Export
+
+import bisect
+import functools
+import threading
+import time
+
+# Latency buckets in seconds, 50us .. 10s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_value(value):
+    """Full-precision sample value; whole numbers (counts) without exponent or decimals"""
+    value = float(value)
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    if value.is_integer() and abs(value) < 2 ** 53:
+        return str(int(value))
+    return repr(value)
+
+def _label_text(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+class Counter:
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        # name is the exposed family name, already ending in _total
+        return [(name, labels, self.value)]
+
+class Gauge:
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = float(value)
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1.0):
+        self.inc(-amount)
+
+    def samples(self, name, labels):
+        return [(name, labels, self.value)]
+
+class Histogram:
+    """Fixed-bucket histogram; percentiles are interpolated within buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def percentile(self, q):
+        """Estimate the q-th percentile (0-100); None when empty"""
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return None
+        target = q / 100.0 * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if count and cumulative + count >= target:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (target - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts, total, value_sum = list(self.counts), self.count, self.sum
+        samples, cumulative = [], 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            samples.append((name + '_bucket', labels + (('le', le),), cumulative))
+        samples.append((name + '_sum', labels, value_sum))
+        samples.append((name + '_count', labels, total))
+        return samples
+
+class _Timer:
+    # Plain class: cheaper to enter and exit than a @contextmanager generator
+    __slots__ = ('histogram', 'started')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started)
+        return False
+
+class MetricsRegistry:
+    """Named metric families, each holding one metric per label set"""
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        if family is None or key not in family['metrics']:
+            with self._lock:
+                family = self._families.setdefault(name, {'kind': cls.kind, 'help': help_text, 'metrics': {}})
+                if family['kind'] != cls.kind:
+                    raise ValueError(f"Metric '{name}' is already a {family['kind']}")
+                family['metrics'].setdefault(key, cls(**kwargs))
+        return family['metrics'][key]
+
+    def counter(self, name, help_text='', **labels):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text='', **labels):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text='', buckets=LATENCY_BUCKETS, **labels):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def timer(self, name, help_text='', **labels):
+        """Context manager observing the duration of a with-block in seconds"""
+        return _Timer(self.histogram(name, help_text, **labels))
+
+    def timed(self, name, help_text='', label='operation', failed=None, **labels):
+        """
+        Decorator observing call duration, labelled with the function name
+
+        Exceptions are counted in <name>_errors before being re-raised. For
+        functions that report failure in their return value instead, pass
+        failed(result) -> bool and those results are counted there too.
+        """
+        def decorator(func):
+            histogram = self.histogram(name, help_text, **labels, **{label: func.__name__})
+            errors_help = f"Calls that raised or reported failure ({name})" if failed else f"Exceptions raised ({name})"
+            errors = self.counter(name + '_errors', errors_help, **labels, **{label: func.__name__})
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                    if failed is not None and failed(result):
+                        errors.inc()
+                    return result
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def _histogram_rows(self, latency, percentiles):
+        # Latency histograms follow the <name>_seconds convention and are shown in ms
+        rows = []
+        with self._lock:
+            families = [(name, family) for name, family in self._families.items()
+                        if family['kind'] == 'histogram' and name.endswith('_seconds') == latency]
+        factor, unit = (1000, '_ms') if latency else (1, '')
+        for name, family in sorted(families):
+            for key, histogram in sorted(family['metrics'].items()):
+                if not histogram.count:
+                    continue
+                row = {
+                    'metric': name,
+                    'labels': ', '.join(f"{k}={v}" for k, v in key),
+                    'count': histogram.count,
+                    'mean' + unit: round(histogram.sum / histogram.count * factor, 3)
+                }
+                for q in percentiles:
+                    row[f'p{q}{unit}'] = round(histogram.percentile(q) * factor, 3)
+                rows.append(row)
+        return rows
+
+    def latency_summary(self, percentiles=(50, 95, 99)):
+        """Rows of {metric, labels, count, mean_ms, p50_ms, ...} for every *_seconds histogram"""
+        return self._histogram_rows(True, percentiles)
+
+    def distribution_summary(self, percentiles=(50, 95, 99)):
+        """Rows of {metric, labels, count, mean, p50, ...} for the other histograms"""
+        return self._histogram_rows(False, percentiles)
+
+    def values(self, kind):
+        """{(name, labels): value} for every counter or gauge"""
+        with self._lock:
+            families = [(name, family) for name, family in self._families.items() if family['kind'] == kind]
+        return {
+            (name, ', '.join(f"{k}={v}" for k, v in key)): metric.value
+            for name, family in families for key, metric in family['metrics'].items()
+        }
+
+    def render_prometheus(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            families = sorted(self._families.items())
+        for name, family in families:
+            # Format 0.0.4 names a counter family after its samples, <name>_total
+            if family['kind'] == 'counter' and not name.endswith('_total'):
+                name += '_total'
+            if family['help']:
+                lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            for key, metric in sorted(family['metrics'].items()):
+                for sample_name, labels, value in metric.samples(name, key):
+                    lines.append(f"{sample_name}{_label_text(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+def start_metrics_server(host='127.0.0.1', port=9100, registry=REGISTRY):
+    """Serve GET /metrics from a daemon thread; returns the HTTPServer"""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
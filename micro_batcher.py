@@ -0,0 +1,164 @@
+# micro_batcher.py - Micro-Batching Prediction Dispatcher
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from metrics import REGISTRY as METRICS
+
+DEFAULT_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+def _snapshot(histogram):
+    """/health view of a metrics.Histogram over DEFAULT_BUCKETS"""
+    labels = [f"<={b}" for b in histogram.buckets] + [f">{histogram.buckets[-1]}"]
+    return {
+        'buckets': dict(zip(labels, histogram.counts)),
+        'count': histogram.count,
+        'mean': round(histogram.sum / histogram.count, 2) if histogram.count else 0.0
+    }
+
+class MicroBatchDispatcher:
+    """
+    Coalesces concurrent single-row predictions into vectorized batches
+
+    Callers submit one feature row and get a Future back. A background thread
+    flushes a lone row straight away; when other rows are already queued it
+    keeps collecting until max_batch_size rows are waiting or the oldest has
+    waited max_wait_ms, then resolves each caller's Future. Batch sizes and
+    queue depths are published as histograms in the metrics registry.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait_ms=2.0, max_queue_size=10000, name='predict'):
+        """
+        Parameters:
+        - predict_batch: Callable taking a 2-D array of rows and returning one
+          result per row (e.g. a partial of predict_student_scores_batch)
+        - max_batch_size: Flush as soon as this many rows are queued
+        - max_wait_ms: Longest time a row waits for companions before flushing
+        - max_queue_size: Bound on queued rows; submit raises queue.Full beyond it
+        - name: 'dispatcher' label on the published histograms
+        """
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._closed = False
+
+        self.batch_sizes = METRICS.histogram('micro_batch_size', 'Rows per micro-batch',
+                                             buckets=DEFAULT_BUCKETS, dispatcher=name)
+        self.queue_depths = METRICS.histogram('micro_batch_queue_depth', 'Rows queued when a micro-batch is flushed',
+                                              buckets=DEFAULT_BUCKETS, dispatcher=name)
+        self.batches = 0
+        self.rows = 0
+        self.errors = 0
+
+        self._worker = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._worker.start()
+
+    def submit(self, feature_values):
+        """Queue one row and return a Future for its prediction"""
+        if self._closed:
+            raise RuntimeError("Dispatcher is closed")
+        future = Future()
+        self._queue.put_nowait((feature_values, future))
+        return future
+
+    def predict(self, feature_values, timeout=None):
+        """Blocking convenience wrapper around submit()"""
+        return self.submit(feature_values).result(timeout=timeout)
+
+    def _collect(self, first):
+        """
+        Gather rows until the batch is full or the wait budget is spent
+
+        A row with nothing queued behind it is flushed at once, so a lone
+        caller never pays max_wait; waiting only starts once there is
+        concurrent traffic to coalesce.
+        """
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0 or len(batch) == 1:
+                    item = self._queue.get_nowait()
+                else:
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _flush(self, batch):
+        rows = [values for values, _ in batch]
+        futures = [future for _, future in batch]
+
+        with self._stats_lock:
+            self.queue_depths.observe(self._queue.qsize() + len(batch))
+            self.batch_sizes.observe(len(batch))
+            self.batches += 1
+            self.rows += len(batch)
+
+        try:
+            results = self.predict_batch(np.asarray(rows, dtype=float))
+        except Exception as e:
+            with self._stats_lock:
+                self.errors += 1
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for future, result in zip(futures, results):
+            future.set_result(result.item() if hasattr(result, 'item') else result)
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+            self._flush(self._collect(first))
+
+        # Drain whatever was queued before close()
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.max_batch_size):
+            self._flush(leftover[start:start + self.max_batch_size])
+
+    def close(self, timeout=5.0):
+        """Flush pending rows and stop the background thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout)
+
+    def stats(self):
+        """
+        Return queue depth and batch-size histograms plus counters
+
+        The histograms are the registry's, so they accumulate across every
+        dispatcher sharing this name (e.g. one per model version).
+        """
+        with self._stats_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'batches': self.batches,
+                'rows': self.rows,
+                'errors': self.errors,
+                'batch_size_histogram': _snapshot(self.batch_sizes),
+                'queue_depth_histogram': _snapshot(self.queue_depths)
+            }
@@ -0,0 +1,184 @@
+# model_artifact.py - Flat, Memory-Mappable Model Artifact
+
+import hashlib
+import json
+import mmap
+import struct
+
+import numpy as np
+
+from model_compiler import QuadraticModel
+
+MODEL_ARTIFACT = 'student_score_model.bin'
+MAGIC = b'SSPMODEL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Magic, format version, header length
+_PREAMBLE = struct.Struct('<8sII')
+
+class ArtifactScaler:
+    """StandardScaler stand-in backed by the artifact's scaler statistics"""
+
+    def __init__(self, mean, scale, feature_names):
+        self.mean_ = mean
+        self.scale_ = scale
+        self.feature_names_in_ = np.array(feature_names, dtype=object)
+        self.n_features_in_ = len(feature_names)
+
+    def transform(self, X):
+        if hasattr(X, 'columns'):
+            X = X[list(self.feature_names_in_)]
+        return (np.asarray(X, dtype=float) - self.mean_) / self.scale_
+
+class ArtifactModel:
+    """Pipeline stand-in: predicts from already-scaled features like model.predict"""
+
+    def __init__(self, quadratic):
+        self.quadratic = quadratic
+
+    def predict(self, X):
+        return self.quadratic.predict(np.asarray(X, dtype=float))
+
+class ModelArtifact:
+    """Arrays and metadata of a loaded artifact (arrays are read-only views)"""
+
+    def __init__(self, header, arrays, buffer=None):
+        self.header = header
+        self.arrays = arrays
+        self.feature_names = header['features']
+        self.model_info = header.get('model_info', {})
+        self.checksum = header['checksum']
+        self._buffer = buffer
+
+        self.scaler = ArtifactScaler(arrays['scaler_mean'], arrays['scaler_scale'], self.feature_names)
+        self.model = ArtifactModel(QuadraticModel(arrays['scaled_A'], arrays['scaled_b'],
+                                                  arrays['scaled_c'][0], self.feature_names))
+        self.kernel = QuadraticModel(arrays['raw_A'], arrays['raw_b'], arrays['raw_c'][0], self.feature_names)
+
+def _pad(length):
+    return (-length) % ALIGNMENT
+
+def export_model_artifact(model, scaler, model_info, path=MODEL_ARTIFACT):
+    """
+    Write model coefficients, scaler statistics and feature order to one file
+
+    Layout: a fixed preamble, a JSON header describing every array, then the
+    arrays as little-endian float64 at 64-byte aligned offsets. The header
+    carries a SHA-256 checksum of the data region.
+
+    Parameters:
+    - model: Fitted sklearn Pipeline (poly -> scaler -> linear)
+    - scaler: Fitted feature StandardScaler
+    - model_info: Contents of model_info.json (feature order and metadata)
+    - path: Output file
+    """
+    from model_compiler import compile_quadratic_model, _split_pipeline
+
+    poly, inner_scaler, linear = _split_pipeline(model)
+    scaled = compile_quadratic_model(model)
+    raw = compile_quadratic_model(model, scaler)
+
+    arrays = {
+        'scaler_mean': scaler.mean_,
+        'scaler_scale': scaler.scale_,
+        'poly_powers': poly.powers_,
+        'linear_coef': np.ravel(linear.coef_),
+        'linear_intercept': np.ravel(linear.intercept_),
+        'scaled_A': scaled.A,
+        'scaled_b': scaled.b,
+        'scaled_c': [scaled.c],
+        'raw_A': raw.A,
+        'raw_b': raw.b,
+        'raw_c': [raw.c]
+    }
+    if inner_scaler is not None:
+        arrays['inner_mean'] = inner_scaler.mean_
+        arrays['inner_scale'] = inner_scaler.scale_
+
+    data = bytearray()
+    layout = {}
+    for name, values in arrays.items():
+        values = np.ascontiguousarray(values, dtype='<f8')
+        data += b'\0' * _pad(len(data))
+        layout[name] = {'offset': len(data), 'shape': list(values.shape), 'dtype': '<f8'}
+        data += values.tobytes()
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'features': list(model_info['features']),
+        'model_info': model_info,
+        'arrays': layout,
+        'checksum': hashlib.sha256(data).hexdigest()
+    }
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b' ' * _pad(_PREAMBLE.size + len(header_bytes))
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(data)
+
+    return header
+
+def load_model_artifact_from_buffer(buffer, verify=True):
+    """
+    Parse an artifact held in any buffer (bytes, mmap, shared memory)
+
+    Arrays are zero-copy read-only views into the buffer, which must stay
+    alive as long as the returned ModelArtifact.
+    """
+    view = memoryview(buffer)
+    magic, version, header_len = _PREAMBLE.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a model artifact (bad magic)")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format version {version}")
+
+    data_start = _PREAMBLE.size + header_len
+    header = json.loads(bytes(view[_PREAMBLE.size:data_start]))
+    data = view[data_start:]
+
+    if verify and hashlib.sha256(data).hexdigest() != header['checksum']:
+        raise ValueError("Model artifact checksum mismatch")
+
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        shape = tuple(spec['shape'])
+        count = int(np.prod(shape)) if shape else 1
+        array = np.frombuffer(data, dtype=spec['dtype'], count=count, offset=spec['offset']).reshape(shape)
+        if array.flags.writeable:
+            array.flags.writeable = False
+        arrays[name] = array
+
+    return ModelArtifact(header, arrays, buffer)
+
+def load_model_artifact(path=MODEL_ARTIFACT, verify=True):
+    """Memory-map an artifact file and return a ModelArtifact (no sklearn needed)"""
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return load_model_artifact_from_buffer(mapped, verify)
+
+def load_artifact_model_and_scaler(path=MODEL_ARTIFACT):
+    """Drop-in for load_model_and_scaler that reads the artifact instead of pickles"""
+    artifact = load_model_artifact(path)
+    return artifact.model, artifact.scaler
+
+if __name__ == '__main__':
+    import sys
+    import joblib
+
+    output = sys.argv[1] if len(sys.argv) > 1 else MODEL_ARTIFACT
+    with open('model_info.json', 'r') as f:
+        info = json.load(f)
+
+    model = joblib.load('student_score_model.pkl')
+    scaler = joblib.load('feature_scaler.pkl')
+    header = export_model_artifact(model, scaler, info, output)
+
+    artifact = load_model_artifact(output)
+    sample = np.array([[80.0, 20.0, 3.5, 75.0, 1.0]])
+    expected = model.predict(scaler.transform(sample))
+    actual = artifact.model.predict(artifact.scaler.transform(sample))
+    print(f"Wrote {output} (checksum {header['checksum'][:12]}), "
+          f"max abs error vs pickles: {float(np.abs(expected - actual).max()):.3e}")
@@ -0,0 +1,197 @@
+# model_compiler.py - Fused Quadratic Inference Kernel
+
+import json
+import numpy as np
+
+class QuadraticModel:
+    """Degree-2 polynomial model folded into score = x·A·x + b·x + c"""
+
+    def __init__(self, A, b, c, feature_names=None):
+        """Store the quadratic form (A is symmetrized on the way in)"""
+        A = np.asarray(A, dtype=float)
+        self.A = (A + A.T) / 2
+        self.b = np.asarray(b, dtype=float)
+        self.c = float(c)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+        # Upper-triangular terms for the scalar single-row path
+        n = len(self.b)
+        self._terms = [
+            (i, j, float(self.A[i, j] if i == j else 2 * self.A[i, j]))
+            for i in range(n) for j in range(i, n)
+            if self.A[i, j] != 0
+        ]
+        self._linear = [(i, float(self.b[i])) for i in range(n) if self.b[i] != 0]
+
+    @property
+    def n_features(self):
+        return len(self.b)
+
+    def predict(self, X):
+        """Raw (unclipped) predictions for a 2-D array of rows"""
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        return np.einsum('ij,ij->i', X @ self.A, X) + X @ self.b + self.c
+
+    def predict_one(self, values):
+        """Raw prediction for a single row without any array allocation"""
+        total = self.c
+        for i, coef in self._linear:
+            total += coef * values[i]
+        for i, j, coef in self._terms:
+            total += coef * values[i] * values[j]
+        return total
+
+    def predict_scores(self, X):
+        """Predictions clipped to 0-100 and rounded like predict_student_score"""
+        return np.round(np.clip(self.predict(X), 0, 100), 2)
+
+    def predict_score(self, values):
+        """Single-row score clipped to 0-100 and rounded to 2 decimals"""
+        prediction = self.predict_one(values)
+        prediction = max(0, min(100, prediction))
+        return round(prediction, 2)
+
+def _split_pipeline(model):
+    """Return (poly, inner_scaler, linear) steps of the saved pipeline"""
+    steps = dict(model.named_steps) if hasattr(model, 'named_steps') else {}
+    poly = steps.get('poly')
+    inner_scaler = steps.get('scaler')
+    linear = steps.get('linear')
+    if poly is None or linear is None:
+        raise ValueError("Expected a Pipeline with 'poly' and 'linear' steps")
+    return poly, inner_scaler, linear
+
+def compile_quadratic_model(model, scaler=None):
+    """
+    Fold a poly -> scaler -> linear pipeline into one quadratic form
+
+    Parameters:
+    - model: Fitted sklearn Pipeline (PolynomialFeatures degree <= 2,
+      optional StandardScaler, LinearRegression)
+    - scaler: Optional fitted StandardScaler applied before the model. When
+      given, the returned form takes raw feature values; otherwise it takes
+      already-scaled values, exactly like model.predict.
+
+    Returns:
+    - QuadraticModel
+    """
+    poly, inner_scaler, linear = _split_pipeline(model)
+
+    powers = np.asarray(poly.powers_)
+    if powers.sum(axis=1).max() > 2:
+        raise ValueError("Only polynomial models up to degree 2 can be compiled")
+    n = powers.shape[1]
+
+    coef = np.asarray(linear.coef_, dtype=float).ravel()
+    intercept = float(np.ravel(linear.intercept_)[0])
+
+    # Inner scaler: w·((p - m) / t) = (w / t)·p - (w / t)·m
+    if inner_scaler is not None:
+        mean = inner_scaler.mean_ if inner_scaler.with_mean else np.zeros_like(coef)
+        scale = inner_scaler.scale_ if inner_scaler.with_std else np.ones_like(coef)
+        weights = coef / scale
+        intercept -= float(weights @ mean)
+    else:
+        weights = coef
+
+    # Distribute polynomial terms into z·Q·z + g·z + c
+    Q = np.zeros((n, n))
+    g = np.zeros(n)
+    c = intercept
+    for w, row in zip(weights, powers):
+        idx = np.flatnonzero(row)
+        if len(idx) == 0:
+            c += w
+        elif row.sum() == 1:
+            g[idx[0]] += w
+        elif len(idx) == 1:
+            Q[idx[0], idx[0]] += w
+        else:
+            i, j = idx
+            Q[i, j] += w / 2
+            Q[j, i] += w / 2
+
+    names = getattr(poly, 'feature_names_in_', None)
+    quadratic = QuadraticModel(Q, g, c, names)
+
+    if scaler is None:
+        return quadratic
+
+    mu = scaler.mean_ if scaler.with_mean else np.zeros(n)
+    s = scaler.scale_ if scaler.with_std else np.ones(n)
+    return fold_scaler(quadratic, mu, s, getattr(scaler, 'feature_names_in_', names))
+
+def fold_scaler(quadratic, mean, scale, feature_names=None):
+    """Turn a form over scaled inputs z = (x - mean) / scale into one over raw x"""
+    # z = D (x - mu) with D = diag(1 / s)
+    mu = np.asarray(mean, dtype=float)
+    d = 1.0 / np.asarray(scale, dtype=float)
+    A = quadratic.A * np.outer(d, d)
+    b = d * quadratic.b - 2 * A @ mu
+    c = quadratic.c + mu @ A @ mu - (d * quadratic.b) @ mu
+
+    if feature_names is None:
+        feature_names = quadratic.feature_names
+    return QuadraticModel(A, b, c, feature_names)
+
+def kernel_for(model, scaler):
+    """Raw-space QuadraticModel for a loaded model/scaler pair (pickles or artifact)"""
+    if hasattr(model, 'quadratic'):
+        return fold_scaler(model.quadratic, scaler.mean_, scaler.scale_)
+    return compile_quadratic_model(model, scaler)
+
+def compile_saved_model(model_path='student_score_model.pkl', scaler_path='feature_scaler.pkl'):
+    """Load the pickled model and scaler and compile them into a QuadraticModel"""
+    import joblib
+
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+    return compile_quadratic_model(model, scaler)
+
+def check_parity(compiled, model, scaler, sample_path='sample_data.json', feature_names=None, tol=1e-6):
+    """
+    Compare the compiled kernel with the sklearn pipeline on sample_data.json
+
+    The samples are stored already scaled, so they are fed to model.predict
+    directly and un-scaled before being fed to the compiled raw-space form.
+
+    Returns:
+    - dict with 'success', 'max_abs_error' and 'samples'
+    """
+    with open(sample_path, 'r') as f:
+        samples = json.load(f)
+
+    if feature_names is None:
+        feature_names = compiled.feature_names
+    Z = np.array([[row[name] for name in feature_names] for row in samples], dtype=float)
+    X = Z * scaler.scale_ + scaler.mean_
+
+    expected = model.predict(Z)
+    actual = compiled.predict(X)
+    single = np.array([compiled.predict_one(row) for row in X])
+
+    max_error = float(max(np.abs(expected - actual).max(), np.abs(expected - single).max()))
+    return {
+        'success': max_error <= tol,
+        'max_abs_error': max_error,
+        'samples': len(samples)
+    }
+
+if __name__ == '__main__':
+    import timeit
+    import joblib
+
+    model = joblib.load('student_score_model.pkl')
+    scaler = joblib.load('feature_scaler.pkl')
+    compiled = compile_quadratic_model(model, scaler)
+
+    result = check_parity(compiled, model, scaler)
+    print(f"Parity on {result['samples']} samples: max abs error {result['max_abs_error']:.3e}"
+          f" ({'OK' if result['success'] else 'FAILED'})")
+
+    row = [80.0, 20.0, 3.5, 75.0, 1.0]
+    runs = 100000
+    per_call = timeit.timeit(lambda: compiled.predict_score(row), number=runs) / runs
+    print(f"Single-row latency: {per_call * 1e9:.0f} ns")
@@ -0,0 +1,236 @@
+# model_registry.py - Versioned Model Registry with Hot Reload
+
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from model_artifact import MODEL_ARTIFACT, load_model_artifact
+from metrics import REGISTRY as METRICS
+
+REGISTRY_ROOT = 'models'
+ACTIVE_POINTER = 'ACTIVE'
+
+class ModelBundle:
+    """One loaded model version plus its metadata and in-flight counter"""
+
+    def __init__(self, version, model, scaler, model_info, feature_info, artifact=None):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+        self.model_info = model_info
+        self.feature_info = feature_info
+        self.artifact = artifact
+        self.in_flight = 0
+
+    def as_tuple(self):
+        """(model, scaler, model_info, feature_info) as returned by load_model_and_data"""
+        return self.model, self.scaler, self.model_info, self.feature_info
+
+class ModelRegistry:
+    """
+    Directory of versioned model artifacts with an "active" pointer
+
+    Layout:
+        models/ACTIVE                     name of the active version
+        models/<version>/student_score_model.bin
+        models/<version>/model_info.json
+        models/<version>/feature_info.json   (optional)
+    """
+
+    def __init__(self, root=REGISTRY_ROOT):
+        self.root = root
+
+    @property
+    def pointer_path(self):
+        return os.path.join(self.root, ACTIVE_POINTER)
+
+    def versions(self):
+        """List published versions"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, name, MODEL_ARTIFACT))
+        )
+
+    def active_version(self):
+        """Return the active version name or None"""
+        try:
+            with open(self.pointer_path, 'r') as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def publish(self, version, artifact_path=MODEL_ARTIFACT, model_info_path='model_info.json',
+                feature_info_path='feature_info.json'):
+        """Copy an artifact and its metadata into a new version directory"""
+        target = os.path.join(self.root, version)
+        if os.path.exists(target):
+            raise ValueError(f"Version '{version}' already exists")
+
+        staging = target + '.tmp'
+        os.makedirs(staging)
+        shutil.copy2(artifact_path, os.path.join(staging, MODEL_ARTIFACT))
+        shutil.copy2(model_info_path, os.path.join(staging, 'model_info.json'))
+        if feature_info_path and os.path.exists(feature_info_path):
+            shutil.copy2(feature_info_path, os.path.join(staging, 'feature_info.json'))
+        os.replace(staging, target)
+        return target
+
+    def activate(self, version):
+        """Point ACTIVE at a published version (atomic rename)"""
+        if version not in self.versions():
+            raise ValueError(f"Unknown version '{version}'")
+        tmp_path = self.pointer_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(version + '\n')
+        os.replace(tmp_path, self.pointer_path)
+
+    @METRICS.timed('model_load_seconds', 'Model load latency')
+    def load_version(self, version, fallback_feature_info='feature_info.json'):
+        """Load a version into a ModelBundle"""
+        directory = os.path.join(self.root, version)
+        artifact = load_model_artifact(os.path.join(directory, MODEL_ARTIFACT))
+
+        with open(os.path.join(directory, 'model_info.json'), 'r') as f:
+            model_info = json.load(f)
+
+        feature_info_path = os.path.join(directory, 'feature_info.json')
+        if not os.path.exists(feature_info_path):
+            feature_info_path = fallback_feature_info
+        with open(feature_info_path, 'r') as f:
+            feature_info = json.load(f)
+
+        return ModelBundle(version, artifact.model, artifact.scaler, model_info, feature_info, artifact)
+
+def warm_up(bundle, sample_path='sample_data.json'):
+    """Run the bundle on sample_data.json (already scaled rows) and check the output"""
+    with open(sample_path, 'r') as f:
+        samples = json.load(f)
+
+    feature_names = bundle.model_info['features']
+    scaled = np.array([[row[name] for name in feature_names] for row in samples], dtype=float)
+    predictions = bundle.model.predict(scaled)
+    if not np.all(np.isfinite(predictions)):
+        raise ValueError(f"Model version '{bundle.version}' produced non-finite warm-up predictions")
+    return predictions
+
+class ModelHandle:
+    """Holds the live ModelBundle and swaps it atomically"""
+
+    def __init__(self, bundle):
+        self._bundle = bundle
+        self._lock = threading.Lock()
+        self._retired = []
+        self._listeners = []
+
+    @property
+    def current(self):
+        return self._bundle
+
+    @contextmanager
+    def acquire(self):
+        """Pin the current bundle for the duration of a request"""
+        with self._lock:
+            bundle = self._bundle
+            bundle.in_flight += 1
+        try:
+            yield bundle
+        finally:
+            with self._lock:
+                bundle.in_flight -= 1
+                self._release_retired()
+
+    def swap(self, bundle):
+        """Make bundle live; the old one stays usable until its requests finish"""
+        with self._lock:
+            old = self._bundle
+            self._bundle = bundle
+            self._retired.append(old)
+            self._release_retired()
+        for listener in list(self._listeners):
+            listener(bundle)
+        return old
+
+    def add_swap_listener(self, listener):
+        """Call listener(new_bundle) after every swap"""
+        self._listeners.append(listener)
+
+    def remove_swap_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _release_retired(self):
+        # Drop references to drained bundles so their memory maps can close
+        self._retired = [bundle for bundle in self._retired if bundle.in_flight > 0]
+
+class ModelWatcher:
+    """Background thread that follows the registry's ACTIVE pointer"""
+
+    def __init__(self, registry, handle, interval=2.0, sample_path='sample_data.json'):
+        self.registry = registry
+        self.handle = handle
+        self.interval = interval
+        self.sample_path = sample_path
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='model-watcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(self.interval + 1)
+
+    def check(self):
+        """Load, warm and swap in the active version if it changed"""
+        version = self.registry.active_version()
+        if version is None or version == self.handle.current.version:
+            return False
+        try:
+            bundle = self.registry.load_version(version)
+            warm_up(bundle, self.sample_path)
+        except Exception as e:
+            # Keep serving the current version; retry on the next poll
+            self.last_error = f"{version}: {str(e)}"
+            return False
+        self.handle.swap(bundle)
+        METRICS.counter('model_swaps', 'Model versions swapped in').inc()
+        self.last_error = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage versioned model artifacts")
+    parser.add_argument('--root', default=REGISTRY_ROOT)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    publish_parser = subparsers.add_parser('publish', help="Publish the current artifact as a new version")
+    publish_parser.add_argument('version')
+    publish_parser.add_argument('--artifact', default=MODEL_ARTIFACT)
+    publish_parser.add_argument('--model-info', default='model_info.json')
+    activate_parser = subparsers.add_parser('activate', help="Make a version live")
+    activate_parser.add_argument('version')
+    subparsers.add_parser('list', help="List versions")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'publish':
+        print(f"Published {registry.publish(args.version, args.artifact, args.model_info)}")
+    elif args.command == 'activate':
+        registry.activate(args.version)
+        print(f"Active version: {args.version}")
+    else:
+        active = registry.active_version()
+        for version in registry.versions():
+            print(f"{'*' if version == active else ' '} {version}")
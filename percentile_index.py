@@ -0,0 +1,87 @@
+# percentile_index.py - Percentile Index over the Training Score Distribution
+
+import numpy as np
+
+PERCENTILE_INDEX = 'score_percentiles.npz'
+
+class PercentileIndex:
+    """
+    Sorted float32 scores queried by binary search
+
+    Small datasets are stored exactly. Larger ones are reduced at build time
+    to a fixed number of evenly spaced quantiles (a simple quantile sketch),
+    and ranks are scaled back to the original population size.
+    """
+
+    def __init__(self, scores, count=None):
+        self.scores = np.asarray(scores, dtype=np.float32)
+        self.count = int(count if count is not None else len(self.scores))
+        self._scale = self.count / len(self.scores)
+
+    @classmethod
+    def build(cls, scores, max_points=100000):
+        """Sort scores, keeping at most max_points evenly spaced quantiles"""
+        scores = np.sort(np.asarray(scores, dtype=np.float64)[np.isfinite(scores)])
+        count = len(scores)
+        if count == 0:
+            raise ValueError("Cannot build a percentile index from no scores")
+        if count > max_points:
+            scores = np.quantile(scores, np.linspace(0, 1, max_points))
+        return cls(scores.astype(np.float32), count)
+
+    def percentile(self, score):
+        """Percentile rank of score: share of the cohort below it (ties count half)"""
+        below = np.searchsorted(self.scores, np.float32(score), side='left')
+        at_or_below = np.searchsorted(self.scores, np.float32(score), side='right')
+        return float(100.0 * (below + at_or_below) / 2 / len(self.scores))
+
+    def rank(self, score):
+        """1-based position in the cohort (1 = best) and cohort size"""
+        above = len(self.scores) - np.searchsorted(self.scores, np.float32(score), side='right')
+        return int(round(above * self._scale)) + 1, self.count
+
+    def save(self, path=PERCENTILE_INDEX):
+        np.savez(path, scores=self.scores, count=np.array([self.count]))
+
+def load_percentile_index(path=PERCENTILE_INDEX):
+    """Load a saved index (a few KB; no CSV needed at runtime)"""
+    with np.load(path) as data:
+        return PercentileIndex(data['scores'], int(data['count'][0]))
+
+def build_from_training_data(csv_path='cleaned_student_data.csv', source='actual', max_points=100000):
+    """
+    Build the index from the training data
+
+    Parameters:
+    - source: 'actual' for the Exam_Score column, 'predicted' for model
+      predictions on the same rows
+    """
+    import json
+    import pandas as pd
+
+    data = pd.read_csv(csv_path)
+    if source == 'actual':
+        scores = data['Exam_Score'].to_numpy(dtype=float)
+    elif source == 'predicted':
+        from model_artifact import load_artifact_model_and_scaler
+        from prediction_function import predict_student_scores_batch
+
+        with open('model_info.json', 'r') as f:
+            feature_names = json.load(f)['features']
+        model, scaler = load_artifact_model_and_scaler()
+        scores = predict_student_scores_batch(model, scaler, data, feature_names)
+    else:
+        raise ValueError("source must be 'actual' or 'predicted'")
+    return PercentileIndex.build(scores, max_points)
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the score percentile index")
+    parser.add_argument('--source', choices=['actual', 'predicted'], default='actual')
+    parser.add_argument('--output', default=PERCENTILE_INDEX)
+    args = parser.parse_args()
+
+    index = build_from_training_data(source=args.source)
+    index.save(args.output)
+    print(f"Indexed {index.count:,} scores ({len(index.scores):,} stored) -> {args.output}")
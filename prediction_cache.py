@@ -0,0 +1,127 @@
+# prediction_cache.py - In-Process Prediction Cache
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MODEL_FILES = ('student_score_model.pkl', 'feature_scaler.pkl', 'student_score_model.bin')
+
+class PredictionCache:
+    """Bounded LRU cache of predictions keyed on the normalized feature vector"""
+
+    def __init__(self, max_size=1024, ttl=3600, precision=4,
+                 model_files=DEFAULT_MODEL_FILES, check_interval=1.0):
+        """
+        Parameters:
+        - max_size: Maximum number of cached predictions
+        - ttl: Seconds an entry stays valid (None disables expiry)
+        - precision: Decimals feature values are rounded to when building keys
+        - model_files: Files whose change invalidates the whole cache
+        - check_interval: Minimum seconds between model file checks
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.precision = precision
+        self.model_files = tuple(model_files)
+        self.check_interval = check_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._model_signature = self._read_model_signature()
+        self._last_check = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _read_model_signature(self):
+        """Return (mtime, size) of every model file so replacements are detected"""
+        signature = []
+        for path in self.model_files:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def _check_model_files(self, now):
+        """Clear the cache if a model file changed since the last check"""
+        if now - self._last_check < self.check_interval:
+            return
+        self._last_check = now
+        signature = self._read_model_signature()
+        if signature != self._model_signature:
+            self._model_signature = signature
+            self._entries.clear()
+            self.invalidations += 1
+
+    def make_key(self, feature_values, feature_names, version=None):
+        """Normalize a feature vector (and the model version that scored it) into a hashable cache key"""
+        values = tuple(round(float(v), self.precision) + 0.0 for v in feature_values)
+        return version, tuple(feature_names), values
+
+    def get(self, feature_values, feature_names, version=None):
+        """Return the cached prediction or None"""
+        key = self.make_key(feature_values, feature_names, version)
+        now = time.monotonic()
+        with self._lock:
+            self._check_model_files(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and now >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, feature_values, feature_names, value, version=None):
+        """Store a prediction, evicting the least recently used entry when full"""
+        key = self.make_key(feature_values, feature_names, version)
+        now = time.monotonic()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, feature_values, feature_names, compute, version=None):
+        """Return the cached prediction, calling compute() on a miss"""
+        value = self.get(feature_values, feature_names, version)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(feature_values, feature_names, value, version)
+        return value
+
+    def clear(self):
+        """Drop every cached prediction"""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
@@ -1,4 +1,3 @@
-
 import pandas as pd
 import joblib
 import numpy as np
@@ -30,6 +29,61 @@ def predict_student_score(model, scaler, feature_values, feature_names):
 
     return round(prediction, 2)
 
+def predict_student_scores_batch(model, scaler, feature_rows, feature_names):
+    """
+    Predict scores for many students in one vectorized pass
+
+    Parameters:
+    - model: Trained ML model
+    - scaler: Fitted StandardScaler
+    - feature_rows: 2-D NumPy array, DataFrame or iterable of rows, each row
+      holding feature values in the same order as feature_names
+    - feature_names: List of feature names
+
+    Returns:
+    - NumPy array of predicted scores, clipped to 0-100 and rounded to 2
+      decimals exactly like predict_student_score
+    """
+    if isinstance(feature_rows, pd.DataFrame):
+        # Select (and reorder) the model columns; extra columns are ignored
+        input_df = feature_rows.loc[:, list(feature_names)]
+    else:
+        if not isinstance(feature_rows, np.ndarray):
+            feature_rows = list(feature_rows)
+        values = np.asarray(feature_rows, dtype=float)
+        if values.size == 0:
+            return np.empty(0, dtype=float)
+        if values.ndim != 2 or values.shape[1] != len(feature_names):
+            raise ValueError(
+                f"Expected rows of {len(feature_names)} features, got array of shape {values.shape}"
+            )
+        input_df = pd.DataFrame(values, columns=feature_names)
+
+    if len(input_df) == 0:
+        return np.empty(0, dtype=float)
+
+    # Scale the features
+    input_scaled = scaler.transform(input_df)
+
+    # Make predictions
+    predictions = model.predict(input_scaled)
+
+    # Ensure predictions are within reasonable bounds (0-100)
+    predictions = np.clip(predictions, 0, 100)
+
+    return np.round(predictions, 2)
+
+# Lower bounds of each grade band, highest first (same as get_grade_info)
+GRADE_THRESHOLDS = [(90, 'A+'), (80, 'A'), (70, 'B'), (60, 'C')]
+LOWEST_GRADE = 'D'
+
+def assign_grades(scores):
+    """Vectorized grade letters for an array of scores"""
+    scores = np.asarray(scores, dtype=float)
+    conditions = [scores >= bound for bound, _ in GRADE_THRESHOLDS]
+    grades = [grade for _, grade in GRADE_THRESHOLDS]
+    return np.select(conditions, grades, default=LOWEST_GRADE)
+
 def load_model_and_scaler():
     """Load the saved model and scaler"""
     model = joblib.load('student_score_model.pkl')
@@ -0,0 +1,194 @@
+# prediction_grid.py - Precomputed Quantized Prediction Grid
+
+import json
+import itertools
+
+import numpy as np
+
+GRID_FILE = 'prediction_grid.npy'
+
+class PredictionGrid:
+    """
+    Raw model predictions precomputed on a regular grid over the feature box
+
+    Values are stored as float32 with one axis per feature; queries are
+    answered by multilinear interpolation between the 2^d surrounding grid
+    points, so the cost is constant and independent of the model. Inputs
+    outside the box are clamped to it, like the predictor form's min/max.
+
+    Standalone and offline only: for the current quadratic model the compiled
+    kernel (model_compiler) is exact and faster than interpolation, so the
+    serving path and the shared-memory bundle do not load a grid.
+    """
+
+    def __init__(self, values, feature_names, lows, highs, max_error=None):
+        self.values = values
+        self.feature_names = list(feature_names)
+        self.lows = np.asarray(lows, dtype=float)
+        self.highs = np.asarray(highs, dtype=float)
+        self.shape = np.array(values.shape)
+        self.steps = (self.highs - self.lows) / (self.shape - 1)
+        self.max_error = max_error
+
+        # Flat offsets of the 2^d cell corners relative to the lower corner
+        strides = np.array(values.strides) // values.itemsize
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self.shape))))
+        self._corner_offsets = self._corners @ strides
+        self._strides = strides
+        self._flat = values.reshape(-1)
+
+        # Plain-Python copies for the scalar single-row path
+        self._axes = list(zip(self.lows.tolist(), self.highs.tolist(), self.steps.tolist(),
+                              self.shape.tolist(), strides.tolist()))
+        self._corner_offset_list = self._corner_offsets.tolist()
+        self._cells = memoryview(np.ascontiguousarray(self._flat))
+
+    @classmethod
+    def build(cls, predict, feature_names, feature_info, points_per_axis=17, chunk_size=200000):
+        """
+        Evaluate predict (raw predictions for a 2-D array) on the grid
+
+        Parameters:
+        - predict: Callable returning unclipped predictions for raw feature rows
+          (e.g. QuadraticModel.predict)
+        - feature_names: Model feature order
+        - feature_info: Contents of feature_info.json (min/max per feature)
+        - points_per_axis: Int or per-feature list of grid points
+        """
+        if np.isscalar(points_per_axis):
+            points_per_axis = [points_per_axis] * len(feature_names)
+        lows = [feature_info[name]['min'] for name in feature_names]
+        highs = [feature_info[name]['max'] for name in feature_names]
+        axes = [np.linspace(low, high, n) for low, high, n in zip(lows, highs, points_per_axis)]
+
+        shape = tuple(points_per_axis)
+        values = np.empty(int(np.prod(shape)), dtype=np.float32)
+        for start in range(0, len(values), chunk_size):
+            flat_index = np.arange(start, min(start + chunk_size, len(values)))
+            index = np.unravel_index(flat_index, shape)
+            rows = np.column_stack([axis[i] for axis, i in zip(axes, index)])
+            values[start:start + len(rows)] = predict(rows)
+
+        return cls(values.reshape(shape), feature_names, lows, highs)
+
+    def predict(self, X):
+        """Interpolated raw predictions for a 2-D array of rows"""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        position = (np.clip(X, self.lows, self.highs) - self.lows) / self.steps
+        cell = np.clip(np.floor(position).astype(np.int64), 0, self.shape - 2)
+        frac = position - cell
+
+        base = cell @ self._strides
+        # weight of each corner = prod(frac where corner bit is 1, 1 - frac otherwise)
+        weights = np.where(self._corners[None, :, :] == 1, frac[:, None, :], 1 - frac[:, None, :]).prod(axis=2)
+        corner_values = self._flat[base[:, None] + self._corner_offsets[None, :]]
+        return (weights * corner_values).sum(axis=1)
+
+    def predict_scores(self, X):
+        """Interpolated predictions clipped to 0-100 and rounded to 2 decimals"""
+        return np.round(np.clip(self.predict(X), 0, 100), 2)
+
+    def predict_one(self, values):
+        """Interpolated raw prediction for a single row without array overhead"""
+        base = 0
+        weights = [1.0]
+        for x, (low, high, step, n, stride) in zip(values, self._axes):
+            position = (min(max(float(x), low), high) - low) / step
+            cell = min(int(position), n - 2)
+            base += cell * stride
+            frac = position - cell
+            # Same corner order as itertools.product((0, 1), repeat=d)
+            weights = [w * g for w in weights for g in (1.0 - frac, frac)]
+
+        cells = self._cells
+        return sum(w * cells[base + offset] for w, offset in zip(weights, self._corner_offset_list))
+
+    def predict_score(self, values):
+        """Single-row score clipped to 0-100 and rounded to 2 decimals"""
+        prediction = self.predict_one(values)
+        prediction = max(0, min(100, prediction))
+        return round(prediction, 2)
+
+    def estimate_max_error(self, predict, max_cells=500000, seed=0):
+        """
+        Worst interpolation error against the exact model, in score points
+
+        For a quadratic model the error inside a cell peaks at its centre, so
+        the exact model is compared at cell centres (all of them, or a random
+        sample of max_cells). Errors are measured after clipping to 0-100, as
+        users see them.
+        """
+        cells = self.shape - 1
+        total = int(np.prod(cells))
+        if total <= max_cells:
+            index = np.arange(total)
+        else:
+            index = np.random.default_rng(seed).choice(total, max_cells, replace=False)
+        cell = np.column_stack(np.unravel_index(index, tuple(cells)))
+        centres = self.lows + (cell + 0.5) * self.steps
+
+        exact = np.clip(predict(centres), 0, 100)
+        approx = np.clip(self.predict(centres), 0, 100)
+        self.max_error = float(np.abs(exact - approx).max())
+        return self.max_error
+
+    def metadata(self):
+        return {
+            'feature_names': self.feature_names,
+            'lows': self.lows.tolist(),
+            'highs': self.highs.tolist(),
+            'shape': self.shape.tolist(),
+            'max_error': self.max_error
+        }
+
+    def save(self, path=GRID_FILE):
+        """Write values as .npy (memory-mappable) plus a JSON sidecar"""
+        np.save(path, self.values)
+        with open(path + '.json', 'w') as f:
+            json.dump(self.metadata(), f, indent=4)
+
+    def to_shared_memory(self, name=None):
+        """Copy values into a new SharedMemory block; returns (shm, metadata)"""
+        from multiprocessing import shared_memory
+
+        shm = shared_memory.SharedMemory(name=name, create=True, size=self.values.nbytes)
+        np.ndarray(self.values.shape, dtype=np.float32, buffer=shm.buf)[...] = self.values
+        return shm, self.metadata()
+
+    @classmethod
+    def from_buffer(cls, buffer, metadata):
+        """Read-only grid over an existing buffer (e.g. SharedMemory.buf)"""
+        values = np.ndarray(tuple(metadata['shape']), dtype=np.float32, buffer=buffer)
+        values.flags.writeable = False
+        return cls(values, metadata['feature_names'], metadata['lows'], metadata['highs'],
+                   metadata.get('max_error'))
+
+def load_prediction_grid(path=GRID_FILE):
+    """Memory-map a saved grid (numpy and json only, no model needed)"""
+    with open(path + '.json', 'r') as f:
+        metadata = json.load(f)
+    values = np.load(path, mmap_mode='r')
+    return PredictionGrid(values, metadata['feature_names'], metadata['lows'], metadata['highs'],
+                          metadata.get('max_error'))
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    from model_artifact import MODEL_ARTIFACT, load_model_artifact
+
+    parser = argparse.ArgumentParser(description="Precompute the prediction lookup grid")
+    parser.add_argument('--points', type=int, default=17, help="Grid points per feature")
+    parser.add_argument('--output', default=GRID_FILE)
+    args = parser.parse_args()
+
+    artifact = load_model_artifact(MODEL_ARTIFACT)
+    with open('feature_info.json', 'r') as f:
+        feature_info = json.load(f)
+
+    started = time.perf_counter()
+    grid = PredictionGrid.build(artifact.kernel.predict, artifact.feature_names, feature_info, args.points)
+    error = grid.estimate_max_error(artifact.kernel.predict)
+    grid.save(args.output)
+    print(f"Built {grid.values.size:,} points ({grid.values.nbytes / 1e6:.1f} MB) in "
+          f"{time.perf_counter() - started:.1f}s; worst-case interpolation error {error:.4f} points")
@@ -0,0 +1,168 @@
+# prediction_logger.py - Write-Behind Prediction History Logger
+
+import atexit
+import json
+import queue
+import threading
+import time
+
+from metrics import REGISTRY as METRICS
+
+class PredictionLogger:
+    """
+    Persists predictions off the request path
+
+    log() only appends a record to a bounded in-memory queue. A background
+    thread writes the queue to the predictions table with executemany inside
+    one transaction, once batch_size records are waiting, the oldest has
+    waited flush_interval seconds, or on flush()/close(). When the queue is
+    full the new record is dropped and counted rather than slowing the
+    request down; history is best effort, the prediction itself is not.
+    """
+
+    def __init__(self, db, batch_size=100, flush_interval=1.0, max_queue_size=10000):
+        """
+        Parameters:
+        - db: db.Database to write to (its save_predictions method)
+        - batch_size: Commit as soon as this many records are queued
+        - flush_interval: Longest time a record waits before being committed
+        - max_queue_size: Bound on queued records; further records are dropped
+        """
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._stats_lock = threading.Lock()
+        self._closed = False
+
+        self.batches = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._written = METRICS.counter('prediction_log_written', 'Predictions committed to history')
+        self._dropped = METRICS.counter('prediction_log_dropped', 'Predictions dropped because the log queue was full')
+        self._failed = METRICS.counter('prediction_log_failed', 'Predictions lost to failed history writes')
+        self._depth = METRICS.gauge('prediction_log_queue_depth', 'Predictions waiting to be written')
+
+        self._worker = threading.Thread(target=self._run, name='prediction-logger', daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    def log(self, user_id, predicted_score, grade, feature_data=None, model_version=None):
+        """
+        Queue one prediction; never blocks
+
+        Parameters:
+        - feature_data: Dict of feature name to value (stored as JSON) or a string
+
+        Returns:
+        - True if queued, False if dropped (queue full or logger closed)
+        """
+        if not isinstance(feature_data, str):
+            feature_data = json.dumps(feature_data) if feature_data is not None else ''
+        record = (user_id, float(predicted_score), grade, feature_data, model_version)
+        if self._closed:
+            return self._drop()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            return self._drop()
+        return True
+
+    def _drop(self):
+        with self._stats_lock:
+            self.dropped += 1
+        self._dropped.inc()
+        return False
+
+    def flush(self, timeout=5.0):
+        """Commit everything queued so far; returns False on timeout"""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def _collect(self, first):
+        """Gather records until the batch is full, the interval ends or a marker arrives"""
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None or isinstance(item, threading.Event):
+                return batch, item
+            batch.append(item)
+        return batch, False
+
+    def _write(self, batch):
+        self._depth.set(self._queue.qsize())
+        result = self.db.save_predictions(batch)
+        with self._stats_lock:
+            self.batches += 1
+            if result['success']:
+                self.written += len(batch)
+            else:
+                self.failed += len(batch)
+        if result['success']:
+            self._written.inc(len(batch))
+        else:
+            self._failed.inc(len(batch))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if isinstance(item, threading.Event):
+                item.set()
+                continue
+            if item is None:
+                break
+            batch, marker = self._collect(item)
+            self._write(batch)
+            if isinstance(marker, threading.Event):
+                marker.set()
+            elif marker is None:
+                break
+
+        # Write whatever was queued before close()
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is not None:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            self._write(leftover[start:start + self.batch_size])
+        self._depth.set(0)
+
+    def close(self, timeout=5.0):
+        """Write pending records and stop the background thread"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._worker.join(timeout)
+
+    def stats(self):
+        """Queue depth and write counters"""
+        with self._stats_lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'batches': self.batches,
+                'written': self.written,
+                'dropped': self.dropped,
+                'failed': self.failed
+            }
@@ -0,0 +1,189 @@
+# shadow_eval.py - Shadow Evaluation of Candidate Models on Live Traffic
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SHADOW_LOG = 'shadow_log.jsonl'
+
+class CandidateStats:
+    """Rolling latency and delta samples plus counters for one candidate"""
+
+    def __init__(self, window=2000):
+        self.latencies_ms = deque(maxlen=window)
+        self.deltas = deque(maxlen=window)
+        self.completed = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.dropped = 0
+
+    def snapshot(self):
+        latencies = np.array(self.latencies_ms, dtype=float)
+        deltas = np.array(self.deltas, dtype=float)
+        summary = {
+            'completed': self.completed,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'dropped': self.dropped
+        }
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            summary.update({'latency_p50_ms': round(float(p50), 3), 'latency_p95_ms': round(float(p95), 3),
+                            'latency_p99_ms': round(float(p99), 3)})
+        if len(deltas):
+            summary.update({'mean_delta': round(float(deltas.mean()), 4),
+                            'mean_abs_delta': round(float(np.abs(deltas).mean()), 4),
+                            'max_abs_delta': round(float(np.abs(deltas).max()), 4)})
+        return summary
+
+class ShadowEvaluator:
+    """
+    Runs candidate models alongside the primary without delaying it
+
+    The caller computes the primary score as usual and then calls observe(),
+    which only queues work on a background thread pool. Each candidate run
+    has a deadline measured from observe(): results that arrive later are
+    counted as timeouts and left out of the comparison, and when more than
+    max_pending runs are queued new ones are dropped rather than allowed to
+    pile up. Completed runs are appended to a JSONL log for offline analysis.
+    """
+
+    def __init__(self, candidates, deadline_ms=50.0, max_workers=2, max_pending=256,
+                 log_path=SHADOW_LOG, window=2000):
+        """
+        Parameters:
+        - candidates: {name: callable(feature_values) -> score}
+        - deadline_ms: Per-request budget for each candidate, including queueing
+        - max_workers: Background threads shared by all candidates
+        - max_pending: Queued runs beyond which new ones are dropped
+        - log_path: JSONL file for per-request records (None to disable)
+        - window: Samples kept per candidate for stats()
+        """
+        self.candidates = dict(candidates)
+        self.deadline = deadline_ms / 1000.0
+        self.max_pending = max_pending
+        self.log_path = log_path
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='shadow')
+        self._lock = threading.Lock()
+        self._log_lock = threading.Lock()
+        self._pending = 0
+        self._stats = {name: CandidateStats(window) for name in self.candidates}
+
+    def observe(self, feature_values, primary_score, primary_version=None):
+        """Queue every candidate on this request; returns immediately"""
+        submitted = time.perf_counter()
+        values = [float(v) for v in feature_values]
+        for name, predict in self.candidates.items():
+            with self._lock:
+                if self._pending >= self.max_pending:
+                    self._stats[name].dropped += 1
+                    continue
+                self._pending += 1
+            self._executor.submit(self._run, name, predict, values, primary_score,
+                                  primary_version, submitted)
+
+    def _run(self, name, predict, values, primary_score, primary_version, submitted):
+        try:
+            if time.perf_counter() - submitted > self.deadline:
+                # Spent the whole budget waiting in the queue; skip the work
+                with self._lock:
+                    self._stats[name].timeouts += 1
+                return
+
+            started = time.perf_counter()
+            try:
+                score = float(predict(values))
+            except Exception:
+                with self._lock:
+                    self._stats[name].errors += 1
+                return
+            finished = time.perf_counter()
+
+            latency_ms = (finished - started) * 1000
+            delta = score - primary_score
+            with self._lock:
+                stats = self._stats[name]
+                if finished - submitted > self.deadline:
+                    stats.timeouts += 1
+                    return
+                stats.completed += 1
+                stats.latencies_ms.append(latency_ms)
+                stats.deltas.append(delta)
+
+            self._log({
+                'timestamp': time.time(),
+                'candidate': name,
+                'primary_version': primary_version,
+                'features': values,
+                'primary_score': primary_score,
+                'candidate_score': score,
+                'delta': round(delta, 4),
+                'latency_ms': round(latency_ms, 4)
+            })
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _log(self, record):
+        if not self.log_path:
+            return
+        line = json.dumps(record) + '\n'
+        with self._log_lock:
+            with open(self.log_path, 'a') as f:
+                f.write(line)
+
+    def stats(self):
+        """Per-candidate counters, latency percentiles and score deltas"""
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in self._stats.items()}
+
+    def close(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+def candidates_from_registry(registry, versions):
+    """Load registry versions as {version: single-row scorer} for ShadowEvaluator"""
+    from model_compiler import kernel_for
+
+    candidates = {}
+    for version in versions:
+        bundle = registry.load_version(version)
+        candidates[version] = kernel_for(bundle.model, bundle.scaler).predict_score
+    return candidates
+
+def shadow_versions_from_env(variable='SHADOW_MODELS'):
+    """Comma-separated registry versions to shadow, e.g. SHADOW_MODELS=v2,v3"""
+    return [version.strip() for version in os.environ.get(variable, '').split(',') if version.strip()]
+
+def summarize_log(path=SHADOW_LOG):
+    """Offline comparison of a shadow log: per-candidate latency and delta summary"""
+    records = {}
+    with open(path, 'r') as f:
+        for line in f:
+            record = json.loads(line)
+            records.setdefault(record['candidate'], []).append(record)
+
+    summary = {}
+    for name, rows in records.items():
+        stats = CandidateStats(window=len(rows))
+        for row in rows:
+            stats.completed += 1
+            stats.latencies_ms.append(row['latency_ms'])
+            stats.deltas.append(row['delta'])
+        summary[name] = stats.snapshot()
+    return summary
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a shadow evaluation log")
+    parser.add_argument('log', nargs='?', default=SHADOW_LOG)
+    args = parser.parse_args()
+
+    for name, summary in summarize_log(args.log).items():
+        print(f"{name}: {json.dumps(summary)}")
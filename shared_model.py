@@ -0,0 +1,207 @@
+# shared_model.py - Host-Level Shared-Memory Model for Multiple Worker Processes
+
+import atexit
+import json
+import os
+import struct
+
+from multiprocessing import resource_tracker, shared_memory
+
+from model_artifact import MODEL_ARTIFACT, load_model_artifact_from_buffer
+from model_registry import ModelBundle
+
+SHARED_PREFIX = 'student_score'
+
+# Length of the JSON manifest that follows it
+_LENGTH = struct.Struct('<Q')
+
+def _segment_names(prefix):
+    return {
+        'manifest': f'{prefix}_manifest',
+        'artifact': f'{prefix}_artifact'
+    }
+
+# Segments created by a SharedModelHost in this process
+_OWNED = set()
+
+class _Segment(shared_memory.SharedMemory):
+    """SharedMemory whose finalizer tolerates arrays still viewing the mapping"""
+
+    def __del__(self):
+        # Arrays handed out by a SharedModel may outlive it at interpreter
+        # exit; the OS unmaps the segment then anyway
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+def _attach(name):
+    """
+    Open an existing segment without taking ownership of it
+
+    Before Python 3.13, attaching registers the segment with this process's
+    resource tracker, which unlinks it when the process exits and so would
+    pull it out from under every other worker. Only the host may unlink.
+    """
+    try:
+        return _Segment(name=name, track=False)
+    except TypeError:
+        pass
+    shm = _Segment(name=name)
+    if name not in _OWNED and os.name == 'posix':
+        # The tracker registers POSIX segments under their '/'-prefixed name
+        resource_tracker.unregister('/' + shm.name.lstrip('/'), 'shared_memory')
+    return shm
+
+class SharedModelHost:
+    """
+    Owner of the shared segments: the model artifact bytes and a JSON
+    manifest holding model_info and feature_info. Create one per host;
+    workers attach by prefix.
+    """
+
+    def __init__(self, prefix=SHARED_PREFIX, artifact_path=MODEL_ARTIFACT, model_info_path='model_info.json',
+                 feature_info_path='feature_info.json', version='default'):
+        self.prefix = prefix
+        self.segments = []
+        names = _segment_names(prefix)
+
+        try:
+            with open(artifact_path, 'rb') as f:
+                artifact_bytes = f.read()
+            load_model_artifact_from_buffer(artifact_bytes)  # Refuse to share a corrupt artifact
+            artifact = self._create(names['artifact'], len(artifact_bytes))
+            artifact.buf[:len(artifact_bytes)] = artifact_bytes
+
+            with open(model_info_path, 'r') as f:
+                model_info = json.load(f)
+            with open(feature_info_path, 'r') as f:
+                feature_info = json.load(f)
+
+            manifest = {
+                'version': version,
+                'artifact_size': len(artifact_bytes),
+                'model_info': model_info,
+                'feature_info': feature_info
+            }
+
+            manifest_bytes = json.dumps(manifest).encode()
+            shm = self._create(names['manifest'], _LENGTH.size + len(manifest_bytes))
+            _LENGTH.pack_into(shm.buf, 0, len(manifest_bytes))
+            shm.buf[_LENGTH.size:_LENGTH.size + len(manifest_bytes)] = manifest_bytes
+        except Exception:
+            self.close()
+            raise
+
+    def _create(self, name, size):
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.segments.append(shm)
+        _OWNED.add(name)
+        return shm
+
+    @property
+    def nbytes(self):
+        return sum(shm.size for shm in self.segments)
+
+    def close(self):
+        """Unmap and remove every segment (workers keep their existing mappings)"""
+        for shm in self.segments:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+            _OWNED.discard(shm.name)
+        self.segments = []
+
+class SharedModel:
+    """A worker's read-only view of the host's shared segments"""
+
+    def __init__(self, prefix=SHARED_PREFIX):
+        names = _segment_names(prefix)
+        self._segments = []
+        self._views = []
+
+        try:
+            manifest_shm = self._open(names['manifest'])
+            (length,) = _LENGTH.unpack_from(manifest_shm.buf, 0)
+            manifest = json.loads(bytes(manifest_shm.buf[_LENGTH.size:_LENGTH.size + length]))
+
+            # Segments may be rounded up to a page size; expose only the artifact bytes
+            artifact_view = self._view(names['artifact'])
+            self.artifact = load_model_artifact_from_buffer(artifact_view[:manifest['artifact_size']])
+        except Exception:
+            self.close()
+            raise
+
+        self.version = manifest['version']
+        self.model_info = manifest['model_info']
+        self.feature_info = manifest['feature_info']
+        # Unmap before interpreter teardown, while the arrays can still be released in order
+        atexit.register(self.close)
+
+    def _open(self, name):
+        shm = _attach(name)
+        self._segments.append(shm)
+        return shm
+
+    def _view(self, name):
+        view = self._open(name).buf.toreadonly()
+        self._views.append(view)
+        return view
+
+    def bundle(self):
+        """ModelBundle over the shared arrays, as returned by the model registry"""
+        return ModelBundle(self.version, self.artifact.model, self.artifact.scaler,
+                           self.model_info, self.feature_info, self.artifact)
+
+    def close(self):
+        """
+        Drop this model's arrays and unmap the segments
+
+        Bundles from bundle() must no longer be in use. A segment that is
+        still referenced stays mapped until the process exits.
+        """
+        self.artifact = None
+        for view in self._views:
+            try:
+                view.release()
+            except BufferError:
+                pass
+        for shm in self._segments:
+            try:
+                shm.close()
+            except BufferError:
+                pass
+        self._views = []
+        self._segments = []
+        atexit.unregister(self.close)
+
+def attach_shared_model(prefix=SHARED_PREFIX):
+    """Attach to a host's segments; raises FileNotFoundError when none are published"""
+    return SharedModel(prefix)
+
+if __name__ == '__main__':
+    import argparse
+    import signal
+    import time
+
+    parser = argparse.ArgumentParser(description="Publish the model into shared memory for worker processes")
+    parser.add_argument('--prefix', default=SHARED_PREFIX)
+    parser.add_argument('--artifact', default=MODEL_ARTIFACT)
+    parser.add_argument('--version', default='default')
+    args = parser.parse_args()
+
+    host = SharedModelHost(args.prefix, args.artifact, version=args.version)
+    print(f"Shared {host.nbytes / 1e6:.2f} MB under prefix '{args.prefix}'; "
+          f"start workers with SHARED_MODEL={args.prefix}. Ctrl+C to remove.")
+
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    try:
+        while not stopping:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        host.close()
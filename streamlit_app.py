@@ -5,6 +5,8 @@ import pandas as pd
 import numpy as np
 import joblib
 import json
+import os
+from functools import partial
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime
@@ -20,6 +22,22 @@ st.set_page_config(
 # Now import auth after page config
 from auth import check_authentication, login_page, signup_page, logout, get_current_user
 from db import Database
+from prediction_cache import PredictionCache
+from prediction_function import GRADE_THRESHOLDS, LOWEST_GRADE, predict_student_scores_batch
+from micro_batcher import MicroBatchDispatcher
+from model_artifact import MODEL_ARTIFACT, load_artifact_model_and_scaler
+from model_registry import ModelBundle, ModelHandle, ModelRegistry, ModelWatcher, warm_up
+from shared_model import attach_shared_model
+from what_if import run_what_if
+from model_compiler import kernel_for
+from goal_seek import seek_goal
+from explain import contribution_items, explain_predictions
+from live_preview import SpeculativeScorer, fill_missing
+from percentile_index import PERCENTILE_INDEX, load_percentile_index
+from metrics import REGISTRY as METRICS, start_metrics_server
+from admission import PREDICT_ADMISSION, Overloaded, client_ip
+from shadow_eval import ShadowEvaluator, candidates_from_registry, shadow_versions_from_env
+from prediction_logger import PredictionLogger
 
 # Initialize database
 db = Database()
@@ -262,32 +280,189 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@METRICS.timed('model_load_seconds', 'Model load latency')
+def load_default_bundle():
+    """Load the model files from the working directory"""
+    # Prefer the flat artifact: memory-mapped, no unpickling or sklearn import
+    if os.path.exists(MODEL_ARTIFACT):
+        model, scaler = load_artifact_model_and_scaler(MODEL_ARTIFACT)
+    else:
+        model = joblib.load('student_score_model.pkl')
+        scaler = joblib.load('feature_scaler.pkl')
+    
+    with open('model_info.json', 'r') as f:
+        model_info = json.load(f)
+    
+    with open('feature_info.json', 'r') as f:
+        feature_info = json.load(f)
+        
+    return ModelBundle('default', model, scaler, model_info, feature_info)
+
 @st.cache_resource
+def get_model_handle():
+    """Live model, hot-swapped from the model registry when one is active"""
+    # Several workers per host attach to one copy published by shared_model.py
+    shared_prefix = os.environ.get('SHARED_MODEL')
+    if shared_prefix:
+        return ModelHandle(attach_shared_model(shared_prefix).bundle())
+    
+    registry = ModelRegistry()
+    version = registry.active_version()
+    if version is None:
+        handle = ModelHandle(load_default_bundle())
+    else:
+        bundle = registry.load_version(version)
+        warm_up(bundle)
+        handle = ModelHandle(bundle)
+    
+    # Follow the pointer even when none exists yet, so activating the first
+    # registry version needs no restart
+    ModelWatcher(registry, handle).start()
+    return handle
+
 def load_model_and_data():
     """Load model and required data"""
     try:
-        model = joblib.load('student_score_model.pkl')
-        scaler = joblib.load('feature_scaler.pkl')
-        
-        with open('model_info.json', 'r') as f:
-            model_info = json.load(f)
-        
-        with open('feature_info.json', 'r') as f:
-            feature_info = json.load(f)
-            
-        return model, scaler, model_info, feature_info
+        return get_model_handle().current.as_tuple()
     except Exception as e:
         st.error(f"Error loading model files: {str(e)}")
         return None, None, None, None
 
+@st.cache_resource
+def get_prediction_cache():
+    """Shared prediction cache for all sessions in this process"""
+    cache = PredictionCache(max_size=4096, ttl=3600)
+    get_model_handle().add_swap_listener(lambda bundle: cache.clear())
+    return cache
+
+def model_version(model):
+    """Version of the live bundle serving model, or None once it has been swapped out"""
+    bundle = get_model_handle().current
+    return bundle.version if bundle.model is model else None
+
+@st.cache_resource
+def get_prediction_dispatcher(_model, _scaler, feature_names, version):
+    """Coalesce concurrent sessions' predictions into vectorized batches"""
+    predict_batch = partial(predict_student_scores_batch, _model, _scaler, feature_names=list(feature_names))
+    dispatcher = MicroBatchDispatcher(predict_batch,
+                                      max_batch_size=int(os.environ.get('PREDICT_BATCH_SIZE', '64')),
+                                      max_wait_ms=float(os.environ.get('PREDICT_BATCH_WAIT_MS', '2.0')))
+    
+    # Stop the thread and drop the cached entry once another version is live,
+    # so the retired model and its memory map can be released
+    handle = get_model_handle()
+    def retire(bundle):
+        if bundle.version != version:
+            handle.remove_swap_listener(retire)
+            dispatcher.close()
+            get_prediction_dispatcher.clear()
+    handle.add_swap_listener(retire)
+    return dispatcher
+
+@st.cache_resource
+def get_live_kernel(_model, _scaler, version):
+    """Compiled quadratic form for microsecond single-row scoring"""
+    return kernel_for(_model, _scaler)
+
+def live_kernel(model, scaler):
+    """Cached kernel for the live model; compiled afresh for one that was swapped out"""
+    version = model_version(model)
+    if version is None:
+        return kernel_for(model, scaler)
+    return get_live_kernel(model, scaler, version)
+
+@st.cache_resource
+def get_shadow_evaluator():
+    """Candidate models from SHADOW_MODELS (registry versions), or None"""
+    versions = shadow_versions_from_env()
+    if not versions:
+        return None
+    candidates = candidates_from_registry(ModelRegistry(), versions)
+    deadline_ms = float(os.environ.get('SHADOW_DEADLINE_MS', '50'))
+    return ShadowEvaluator(candidates, deadline_ms=deadline_ms)
+
+def shadow_predict(feature_values, prediction):
+    """Compare candidates against the primary prediction in the background"""
+    try:
+        evaluator = get_shadow_evaluator()
+        if evaluator is not None:
+            evaluator.observe(feature_values, prediction, get_model_handle().current.version)
+    except Exception:
+        # Shadow models must never affect the primary prediction
+        pass
+
+@st.cache_resource
+def get_prediction_logger():
+    """Write-behind history log shared by every session in this process"""
+    return PredictionLogger(db, batch_size=100, flush_interval=1.0, max_queue_size=10000)
+
+def log_prediction(predicted_score, grade):
+    """Queue the shown prediction for the user's history, once per submission"""
+    user = get_current_user()
+    if user is None or st.session_state.get('prediction_logged', True):
+        return
+    st.session_state.prediction_logged = True
+    try:
+        feature_data = dict(zip(st.session_state.feature_names, map(float, st.session_state.prediction_data)))
+        get_prediction_logger().log(user['id'], predicted_score, grade, feature_data,
+                                    get_model_handle().current.version)
+    except Exception:
+        # History is best effort and must never break the results page
+        pass
+
+@st.cache_resource
+def get_percentile_index():
+    """Sorted training-score distribution for real percentile ranks"""
+    if not os.path.exists(PERCENTILE_INDEX):
+        return None
+    return load_percentile_index(PERCENTILE_INDEX)
+
+def ordinal(n):
+    """1 -> '1st', 22 -> '22nd', 13 -> '13th'"""
+    if 10 <= n % 100 <= 20:
+        return f"{n}th"
+    return f"{n}{ {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th') }"
+
+@st.cache_resource
+def get_metrics_server():
+    """Prometheus scrape endpoint on METRICS_PORT (disabled when unset)"""
+    port = os.environ.get('METRICS_PORT')
+    if not port:
+        return None
+    return start_metrics_server(os.environ.get('METRICS_HOST', '127.0.0.1'), int(port))
+
+def is_admin(user):
+    """Admins are listed by username in ADMIN_USERS (comma-separated)"""
+    admins = {name.strip() for name in os.environ.get('ADMIN_USERS', '').split(',') if name.strip()}
+    return bool(user) and user['username'] in admins
+
+@METRICS.timed('predict_score_seconds', 'predict_score latency including cache lookup')
 def predict_score(model, scaler, feature_values, feature_names):
     """Make prediction"""
+    # Entries are keyed on the model version; a model swapped out mid-rerun
+    # (version None) is scored directly and never read from or written to the cache
+    cache = get_prediction_cache()
+    version = model_version(model)
+    cached = cache.get(feature_values, feature_names, version) if version is not None else None
+    if cached is not None:
+        METRICS.counter('prediction_cache_hits', 'predict_score calls answered from the cache').inc()
+        return cached
+    
+    user, ip = get_current_user(), client_ip()
     try:
-        input_df = pd.DataFrame([feature_values], columns=feature_names)
-        input_scaled = scaler.transform(input_df)
-        prediction = model.predict(input_scaled)[0]
-        prediction = max(0, min(100, prediction))
-        return round(prediction, 2)
+        with PREDICT_ADMISSION.admit(f"user:{user['id']}" if user else None, f"ip:{ip}" if ip else None):
+            if version is None:
+                prediction = float(predict_student_scores_batch(model, scaler, [feature_values],
+                                                                feature_names=list(feature_names))[0])
+            else:
+                dispatcher = get_prediction_dispatcher(model, scaler, tuple(feature_names), version)
+                prediction = dispatcher.predict(feature_values, timeout=5.0)
+        if version is not None:
+            cache.put(feature_values, feature_names, prediction, version)
+        return prediction
+    except Overloaded as e:
+        st.warning(f"⏳ The predictor is busy. Please try again in {e.retry_after:.0f} seconds.")
+        return None
     except Exception as e:
         st.error(f"Prediction error: {str(e)}")
         return None
@@ -327,18 +502,99 @@ def create_animated_gauge(score):
     )
     return fig
 
+def create_sensitivity_chart(what_if, feature_info):
+    """Score as each feature moves across its range, others held fixed"""
+    fig = go.Figure()
+    colors = ['#ff6b6b', '#4ecdc4', '#45b7d1', '#ffd93d', '#6bcf7f']
+    for i, (feature, curve) in enumerate(what_if['curves'].items()):
+        info = feature_info[feature]
+        position = (curve['values'] - info['min']) / (info['max'] - info['min']) * 100
+        fig.add_trace(go.Scatter(
+            x=position,
+            y=curve['scores'],
+            mode='lines',
+            name=feature.replace('_', ' ').title(),
+            line={'color': colors[i % len(colors)], 'width': 3},
+            customdata=curve['values'],
+            hovertemplate='%{customdata:.1f} → %{y:.1f}<extra>%{fullData.name}</extra>'
+        ))
+    fig.add_hline(y=what_if['base_score'], line_dash='dash', line_color='#ffffff', opacity=0.5)
+    
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#ffffff",
+        height=400,
+        xaxis_title="Position in feature range (%)",
+        yaxis_title="Predicted score",
+        legend={'orientation': 'h', 'y': -0.25}
+    )
+    return fig
+
+def create_contribution_waterfall(explanation):
+    """Waterfall from the average student's score to this prediction"""
+    items = contribution_items(explanation)
+    labels = ["Average student"] + [label.replace('_', ' ') for label, _ in items] + ["Your score"]
+    values = [explanation['base_value']] + [value for _, value in items] + [float(explanation['predictions'][0])]
+    
+    fig = go.Figure(go.Waterfall(
+        orientation='v',
+        measure=['absolute'] + ['relative'] * len(items) + ['total'],
+        x=labels,
+        y=values,
+        text=[f"{values[0]:.1f}"] + [f"{value:+.2f}" for _, value in items] + [f"{values[-1]:.1f}"],
+        textposition='outside',
+        connector={'line': {'color': 'rgba(255,255,255,0.3)'}},
+        increasing={'marker': {'color': '#6bcf7f'}},
+        decreasing={'marker': {'color': '#ff6b6b'}},
+        totals={'marker': {'color': '#00d4ff'}}
+    ))
+    
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#ffffff",
+        height=420,
+        yaxis_title="Predicted score",
+        showlegend=False
+    )
+    return fig
+
+def create_what_if_heatmap(heatmap):
+    """Predicted score over a grid of two features"""
+    fig = go.Figure(go.Heatmap(
+        x=heatmap['x'],
+        y=heatmap['y'],
+        z=heatmap['scores'],
+        colorscale='Turbo',
+        zmin=0,
+        zmax=100,
+        colorbar={'title': 'Score'},
+        hovertemplate='%{x:.1f}, %{y:.1f} → %{z:.1f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font_color="#ffffff",
+        height=400,
+        xaxis_title=heatmap['x_feature'].replace('_', ' ').title(),
+        yaxis_title=heatmap['y_feature'].replace('_', ' ').title()
+    )
+    return fig
+
+GRADE_STYLES = {
+    'A+': {'class': 'grade-a', 'emoji': '🏆', 'title': 'Outstanding!'},
+    'A': {'class': 'grade-a', 'emoji': '⭐', 'title': 'Excellent!'},
+    'B': {'class': 'grade-b', 'emoji': '👍', 'title': 'Good Job!'},
+    'C': {'class': 'grade-c', 'emoji': '📚', 'title': 'Keep Going!'},
+    'D': {'class': 'grade-d', 'emoji': '💪', 'title': 'You Can Do Better!'}
+}
+
 def get_grade_info(score):
-    """Get grade and styling info"""
-    if score >= 90:
-        return {'grade': 'A+', 'class': 'grade-a', 'emoji': '🏆', 'title': 'Outstanding!'}
-    elif score >= 80:
-        return {'grade': 'A', 'class': 'grade-a', 'emoji': '⭐', 'title': 'Excellent!'}
-    elif score >= 70:
-        return {'grade': 'B', 'class': 'grade-b', 'emoji': '👍', 'title': 'Good Job!'}
-    elif score >= 60:
-        return {'grade': 'C', 'class': 'grade-c', 'emoji': '📚', 'title': 'Keep Going!'}
-    else:
-        return {'grade': 'D', 'class': 'grade-d', 'emoji': '💪', 'title': 'You Can Do Better!'}
+    """Get grade and styling info (bands from prediction_function.GRADE_THRESHOLDS)"""
+    grade = next((name for bound, name in GRADE_THRESHOLDS if score >= bound), LOWEST_GRADE)
+    return {'grade': grade, **GRADE_STYLES[grade]}
 
 def get_personalized_tips(score):
     """Get personalized tips based on score"""
@@ -390,6 +646,8 @@ def sidebar_content():
         else:
             page_options = ["🏠 Dashboard", "📊 Predictor", "💡 Tips & Tricks", "❓ How to Use"]
             default_index = 1
+        if is_admin(user):
+            page_options.append("📈 Metrics")
         
         page = st.radio("Navigate", page_options, index=default_index)
         
@@ -434,6 +692,8 @@ def main():
             signup_page()
         return
     
+    get_metrics_server()
+    
     # Load model and data
     model, scaler, model_info, feature_info = load_model_and_data()
     
@@ -441,22 +701,31 @@ def main():
         st.error("🚨 Failed to load model files.")
         st.stop()
     
+    # Pin this model version until the page has rendered, even if a new one is swapped in
+    with get_model_handle().acquire() as bundle:
+        render_page(*bundle.as_tuple())
+
+def render_page(model, scaler, model_info, feature_info):
+    """Render sidebar, header and the selected page"""
     # Sidebar navigation
     page = sidebar_content()
     
     # Main header
     st.markdown('<h1 class="main-dashboard-header">🎓 Student Score Predictor AI</h1>', unsafe_allow_html=True)
     
-    if page == "🏠 Dashboard":
-        show_dashboard()
-    elif page == "📊 Predictor":
-        show_predictor(model, scaler, model_info, feature_info)
-    elif page == "🎯 Results":
-        show_results(model, scaler, model_info, feature_info)
-    elif page == "💡 Tips & Tricks":
-        show_tips()
-    else:
-        show_how_to_use()
+    with METRICS.timer('page_render_seconds', 'Page render latency', page=page.split(' ', 1)[-1]):
+        if page == "🏠 Dashboard":
+            show_dashboard()
+        elif page == "📊 Predictor":
+            show_predictor(model, scaler, model_info, feature_info)
+        elif page == "🎯 Results":
+            show_results(model, scaler, model_info, feature_info)
+        elif page == "💡 Tips & Tricks":
+            show_tips()
+        elif page == "📈 Metrics" and is_admin(get_current_user()):
+            show_metrics()
+        else:
+            show_how_to_use()
 
 def show_dashboard():
     """Show dashboard page"""
@@ -596,7 +865,7 @@ def show_predictor(model, scaler, model_info, feature_info):
                     placeholder=f"Enter value ({info['min']:.1f} - {info['max']:.1f})",
                     key=f"input_{i}"
                 )
-                feature_values.append(value if value is not None else 0.0)
+                feature_values.append(value)
     
     with col2:
         st.markdown('<h4 style="color: rgba(255,255,255,0.9); font-size: 1rem; margin-bottom: 1rem;">🏃‍♂️ Lifestyle Factors</h4>', unsafe_allow_html=True)
@@ -613,16 +882,61 @@ def show_predictor(model, scaler, model_info, feature_info):
                     placeholder=f"Enter value ({info['min']:.1f} - {info['max']:.1f})",
                     key=f"input_{i}"
                 )
-                feature_values.append(value if value is not None else 0.0)
+                feature_values.append(value)
     
     st.markdown('</div>', unsafe_allow_html=True)
     
+    live = st.toggle("⚡ Live preview", value=True, key="live_preview",
+                     help="Estimate your score as you type; blank fields use the average student's value")
+    if live:
+        show_live_preview(model, scaler, feature_names, feature_info)
+    
     if st.button("🚀 Predict My Score", key="main_predict"):
+        # Blank fields take the training mean, exactly as in the live preview
+        feature_values, _ = fill_missing(feature_values, feature_names, feature_info)
         st.session_state.prediction_data = feature_values.copy()
         st.session_state.feature_names = feature_names.copy()
+        st.session_state.prediction_logged = False
+        st.session_state.prediction_shadowed = False
         st.session_state.show_results = True
         st.rerun()
 
+def show_live_preview(model, scaler, feature_names, feature_info):
+    """Speculative score for the current (possibly partial) form input"""
+    raw_values = [st.session_state.get(f"input_{i}") for i in range(len(feature_names))]
+    if all(value is None for value in raw_values):
+        st.caption("Start entering values to see a live estimate.")
+        return
+    
+    version = model_version(model)
+    if version is None:
+        # Swapped out mid-rerun; the next rerun scores with the new model
+        return
+    
+    # Every edit already reruns the page and the kernel costs microseconds,
+    # so score on each rerun and skip only unchanged input
+    values, missing = fill_missing(raw_values, feature_names, feature_info)
+    scorer = st.session_state.setdefault('live_scorer', SpeculativeScorer())
+    kernel = get_live_kernel(model, scaler, version)
+    score = scorer.update((tuple(values), version), values, kernel.predict_score)
+    
+    grade_info = get_grade_info(score)
+    note = "complete profile" if missing == 0 else f"estimate · {missing} field{'s' if missing > 1 else ''} left blank"
+    st.markdown(f"""
+    <div class="metric-card">
+        <div class="metric-value">{score} {grade_info['emoji']}</div>
+        <div class="metric-label">Live Estimate · Grade {grade_info['grade']} · {note}</div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def speculative_score(model, feature_values):
+    """Live-preview score computed for exactly these values, if any"""
+    scorer = st.session_state.get('live_scorer')
+    version = model_version(model)
+    if scorer is None or version is None:
+        return None
+    return scorer.result_for((tuple(float(v) for v in feature_values), version))
+
 def show_results(model, scaler, model_info, feature_info):
     """Show results page"""
     
@@ -633,13 +947,24 @@ def show_results(model, scaler, model_info, feature_info):
             st.rerun()
         return
     
-    predicted_score = predict_score(model, scaler, st.session_state.prediction_data, st.session_state.feature_names)
+    # Reuse the live preview's score when it was computed for this exact input.
+    # That path does no model work, so it skips predict admission control;
+    # shadow evaluation and history logging below still see it.
+    predicted_score = speculative_score(model, st.session_state.prediction_data)
+    if predicted_score is None:
+        predicted_score = predict_score(model, scaler, st.session_state.prediction_data, st.session_state.feature_names)
     
     if predicted_score is None:
         st.error("❌ Error generating prediction.")
         return
     
+    # Once per submission, whichever path produced the score
+    if not st.session_state.get('prediction_shadowed', True):
+        st.session_state.prediction_shadowed = True
+        shadow_predict(st.session_state.prediction_data, predicted_score)
+    
     grade_info = get_grade_info(predicted_score)
+    log_prediction(predicted_score, grade_info['grade'])
     
     col1, col2 = st.columns([1, 1])
     
@@ -668,11 +993,18 @@ def show_results(model, scaler, model_info, feature_info):
             """, unsafe_allow_html=True)
         
         with col_m2:
-            percentile = min(99, max(1, int((predicted_score / 100) * 100)))
+            percentile_index = get_percentile_index()
+            if percentile_index is not None:
+                percentile = ordinal(min(99, max(1, int(round(percentile_index.percentile(predicted_score))))))
+                rank, cohort = percentile_index.rank(predicted_score)
+                percentile_label = f"Percentile · #{rank:,} of {cohort:,}"
+            else:
+                percentile = "N/A"
+                percentile_label = "Percentile"
             st.markdown(f"""
             <div class="metric-card">
-                <div class="metric-value">{percentile}th</div>
-                <div class="metric-label">Percentile</div>
+                <div class="metric-value">{percentile}</div>
+                <div class="metric-label">{percentile_label}</div>
             </div>
             """, unsafe_allow_html=True)
         
@@ -690,6 +1022,14 @@ def show_results(model, scaler, model_info, feature_info):
         gauge_fig = create_animated_gauge(predicted_score)
         st.plotly_chart(gauge_fig, use_container_width=True)
     
+    st.markdown("---")
+    show_contributions(model, scaler)
+    
+    show_what_if(model, scaler, feature_info)
+    
+    st.markdown("---")
+    show_goal_seeker(model, scaler, feature_info, predicted_score)
+    
     st.markdown("---")
     st.markdown('<h3 style="color: #00d4ff; margin: 1.5rem 0;">💡 Personalized Recommendations</h3>', unsafe_allow_html=True)
     
@@ -729,6 +1069,149 @@ def show_results(model, scaler, model_info, feature_info):
             st.session_state.show_results = False
             st.rerun()
 
+def show_contributions(model, scaler):
+    """Exact breakdown of the prediction into feature and interaction effects"""
+    st.markdown('<h3 style="color: #00d4ff; margin: 1.5rem 0;">🧩 What Drove Your Score</h3>', unsafe_allow_html=True)
+    
+    try:
+        explanation = explain_predictions(model, scaler, [st.session_state.prediction_data],
+                                          st.session_state.feature_names)
+    except Exception as e:
+        st.error(f"Explanation error: {str(e)}")
+        return
+    
+    st.plotly_chart(create_contribution_waterfall(explanation), use_container_width=True)
+    raw = float(explanation['predictions'][0])
+    if raw < 0 or raw > 100:
+        st.caption(f"The model's raw output ({raw:.1f}) is shown; your displayed score is capped to the 0-100 range.")
+
+def show_what_if(model, scaler, feature_info):
+    """What-if explorer: sensitivity curves and a two-feature heatmap"""
+    st.markdown('<h3 style="color: #00d4ff; margin: 1.5rem 0;">🔮 What-If Explorer</h3>', unsafe_allow_html=True)
+    
+    feature_names = st.session_state.feature_names
+    labels = {name: name.replace('_', ' ').title() for name in feature_names}
+    
+    col_x, col_y = st.columns(2)
+    with col_x:
+        x_feature = st.selectbox("Heatmap X axis", feature_names, format_func=labels.get,
+                                 index=feature_names.index('Hours_Studied') if 'Hours_Studied' in feature_names else 0,
+                                 key="what_if_x")
+    with col_y:
+        y_options = [name for name in feature_names if name != x_feature]
+        y_feature = st.selectbox("Heatmap Y axis", y_options, format_func=labels.get,
+                                 index=y_options.index('Tutoring_Sessions') if 'Tutoring_Sessions' in y_options else 0,
+                                 key="what_if_y")
+    
+    # Every scenario is scored in a single batched model call
+    predict_batch = partial(predict_student_scores_batch, model, scaler, feature_names=feature_names)
+    try:
+        what_if = run_what_if(predict_batch, st.session_state.prediction_data, feature_names,
+                              feature_info, pair=(x_feature, y_feature), points=40, pair_points=40)
+    except Exception as e:
+        st.error(f"What-if error: {str(e)}")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown('<h4 style="color: #00d4ff;">📈 Sensitivity Curves</h4>', unsafe_allow_html=True)
+        st.plotly_chart(create_sensitivity_chart(what_if, feature_info), use_container_width=True)
+    with col2:
+        st.markdown('<h4 style="color: #00d4ff;">🗺️ Two-Factor Heatmap</h4>', unsafe_allow_html=True)
+        st.plotly_chart(create_what_if_heatmap(what_if['heatmap']), use_container_width=True)
+
+def show_goal_seeker(model, scaler, feature_info, predicted_score):
+    """Goal seeker: least-effort change to chosen features that reaches a target grade"""
+    st.markdown('<h3 style="color: #00d4ff; margin: 1.5rem 0;">🎯 Goal Seeker</h3>', unsafe_allow_html=True)
+    
+    targets = [(bound, grade) for bound, grade in reversed(GRADE_THRESHOLDS) if bound > predicted_score]
+    if not targets:
+        st.success("🏆 You're already in the top grade band!")
+        return
+    
+    feature_names = st.session_state.feature_names
+    labels = {name: name.replace('_', ' ').title() for name in feature_names}
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        target_bound, target_grade = st.selectbox(
+            "Target grade", targets, format_func=lambda t: f"{t[1]} ({t[0]}+)", key="goal_grade"
+        )
+    with col2:
+        default_features = [name for name in ('Hours_Studied', 'Tutoring_Sessions') if name in feature_names]
+        adjustable = st.multiselect("Features you can change", feature_names, default=default_features,
+                                    format_func=labels.get, key="goal_features")
+    with col3:
+        budget = st.slider("Max change per feature (% of range)", 5, 100, 100, step=5, key="goal_budget")
+    
+    if not adjustable:
+        st.info("Select at least one feature to change.")
+        return
+    
+    max_changes = {
+        name: (feature_info[name]['max'] - feature_info[name]['min']) * budget / 100
+        for name in adjustable
+    }
+    result = seek_goal(live_kernel(model, scaler), st.session_state.prediction_data, feature_names,
+                       feature_info, target_bound, adjustable=adjustable, max_changes=max_changes)
+    
+    if not result['success']:
+        st.warning(f"⚠️ A grade of {target_grade} can't be reached by changing only these features within the allowed range.")
+        return
+    
+    cols = st.columns(max(1, len(result['changes'])))
+    for col, (name, change) in zip(cols, result['changes'].items()):
+        current = st.session_state.prediction_data[feature_names.index(name)]
+        with col:
+            st.markdown(f"""
+            <div class="tip-card">
+                <div class="tip-title">{labels[name]}</div>
+                <div class="metric-value">{current:.1f} → {result['new_values'][name]:.1f}</div>
+                <div class="tip-content">{change:+.1f}</div>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    st.markdown(f"""
+    <div class="tip-content" style="text-align: center; margin-top: 0.5rem;">
+        Predicted score with these changes: <b>{result['predicted_score']}</b> (Grade {target_grade})
+    </div>
+    """, unsafe_allow_html=True)
+    st.caption("The smallest combined change, with each feature's change measured in standard deviations "
+               "of the training data.")
+
+def show_metrics():
+    """Admin-only view of in-process latency histograms and counters"""
+    st.markdown('<h3 style="color: #00d4ff; margin-bottom: 1rem;">📈 Runtime Metrics</h3>', unsafe_allow_html=True)
+    
+    cache_stats = get_prediction_cache().stats()
+    METRICS.gauge('prediction_cache_size', 'Entries in the prediction cache').set(cache_stats['size'])
+    METRICS.gauge('prediction_cache_hit_rate', 'Prediction cache hit rate').set(cache_stats['hit_rate'])
+    
+    latency = METRICS.latency_summary()
+    if latency:
+        st.markdown("**Latency per operation (ms)**")
+        st.dataframe(pd.DataFrame(latency), use_container_width=True, hide_index=True)
+    else:
+        st.info("No operations recorded yet.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Counters**")
+        counters = [{'metric': name, 'labels': labels, 'value': value} for (name, labels), value in METRICS.values('counter').items()]
+        st.dataframe(pd.DataFrame(counters), use_container_width=True, hide_index=True)
+    with col2:
+        st.markdown("**Gauges**")
+        gauges = [{'metric': name, 'labels': labels, 'value': value} for (name, labels), value in METRICS.values('gauge').items()]
+        st.dataframe(pd.DataFrame(gauges), use_container_width=True, hide_index=True)
+    
+    distributions = METRICS.distribution_summary()
+    if distributions:
+        st.markdown("**Micro-batching and other distributions**")
+        st.dataframe(pd.DataFrame(distributions), use_container_width=True, hide_index=True)
+    
+    with st.expander("Prometheus text format"):
+        st.code(METRICS.render_prometheus(), language='text')
+
 def show_tips():
     """Show tips page"""
     st.markdown("### 💡 Study Tips & Tricks")
@@ -0,0 +1,71 @@
+# what_if.py - Vectorized What-If Sensitivity Engine
+
+import numpy as np
+
+def feature_axis(feature_info, name, points):
+    """Evenly spaced values across a feature's recorded min/max range"""
+    info = feature_info[name]
+    return np.linspace(float(info['min']), float(info['max']), points)
+
+def run_what_if(predict_batch, base_values, feature_names, feature_info,
+                pair=None, points=25, pair_points=25):
+    """
+    Score one- and two-feature perturbations of a submitted vector in one call
+
+    Parameters:
+    - predict_batch: Callable taking a 2-D array of rows and returning scores
+    - base_values: The submitted feature vector, in feature_names order
+    - feature_names: Model feature order
+    - feature_info: Contents of feature_info.json (min/max per feature)
+    - pair: Optional (x_feature, y_feature) for the two-feature heatmap
+    - points: Sweep points per feature for the sensitivity curves
+    - pair_points: Points per axis for the heatmap
+
+    Returns:
+    - dict with 'base_score', 'curves' ({feature: {'values', 'scores'}}) and,
+      when pair is given, 'heatmap' ({'x_feature', 'y_feature', 'x', 'y', 'scores'})
+    """
+    base = np.asarray(base_values, dtype=float)
+    blocks = [base[None, :]]
+
+    # One-feature sweeps: copy the base row and vary a single column
+    axes = {}
+    for i, name in enumerate(feature_names):
+        axes[name] = feature_axis(feature_info, name, points)
+        block = np.repeat(base[None, :], points, axis=0)
+        block[:, i] = axes[name]
+        blocks.append(block)
+
+    # Two-feature grid
+    if pair is not None:
+        x_name, y_name = pair
+        xi, yi = feature_names.index(x_name), feature_names.index(y_name)
+        x_axis = feature_axis(feature_info, x_name, pair_points)
+        y_axis = feature_axis(feature_info, y_name, pair_points)
+        grid_x, grid_y = np.meshgrid(x_axis, y_axis)
+        block = np.repeat(base[None, :], grid_x.size, axis=0)
+        block[:, xi] = grid_x.ravel()
+        block[:, yi] = grid_y.ravel()
+        blocks.append(block)
+
+    scores = np.asarray(predict_batch(np.vstack(blocks)), dtype=float)
+
+    result = {'base_score': float(scores[0]), 'curves': {}}
+    offset = 1
+    for name in feature_names:
+        result['curves'][name] = {
+            'values': axes[name],
+            'scores': scores[offset:offset + points]
+        }
+        offset += points
+
+    if pair is not None:
+        result['heatmap'] = {
+            'x_feature': x_name,
+            'y_feature': y_name,
+            'x': x_axis,
+            'y': y_axis,
+            'scores': scores[offset:].reshape(len(y_axis), len(x_axis))
+        }
+
+    return result